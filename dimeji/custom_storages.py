@@ -4,29 +4,103 @@ Custom Azure Storage classes for handling static and media files separately.
 This allows us to use different Azure Blob Storage containers for:
 - Static files (CSS, JS, images that are part of the application)
 - Media files (User-uploaded content)
+
+Both memoize their public URLs (see CachedURLMixin), so list pages don't
+pay for building a blob client per row.
 """
 
+from azure.core.exceptions import ResourceNotFoundError
 from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
 from storages.backends.azure_storage import AzureStorage
 
+from website.cache import LRUCache
+
+# Shared by every storage instance; keys include the container
+_url_cache = LRUCache(maxsize=getattr(settings, 'STORAGE_URL_CACHE_SIZE', 4096))
+
+
+class CachedURLMixin:
+    """
+    Memoize ``url()`` in a bounded per-process LRU keyed by (container, name).
 
-class AzureMediaStorage(AzureStorage):
+    Only unsigned URLs are cached: they are a pure function of the name, so
+    an entry can never go stale. Calls asking for an expiry, or made while
+    the storage signs URLs by default, go straight to the backend.
+    """
+
+    def url_cache_key(self, name):
+        return (getattr(self, 'azure_container', None) or getattr(self, 'location', ''), name)
+
+    def _url_is_cacheable(self, args, kwargs):
+        return not args and not kwargs and not getattr(self, 'expiration_secs', None)
+
+    def url(self, name, *args, **kwargs):
+        if not self._url_is_cacheable(args, kwargs):
+            return super().url(name, *args, **kwargs)
+        key = self.url_cache_key(name)
+        url = _url_cache.get(key)
+        if url is None:
+            url = super().url(name)
+            _url_cache.set(key, url)
+        return url
+
+    def urls(self, names):
+        """Resolve many names at once, returning {name: url}; empty names are skipped"""
+        return {name: self.url(name) for name in dict.fromkeys(names) if name}
+
+
+def bulk_urls(storage, names):
+    """{name: url} for ``names``, using the storage's batch lookup if it has one"""
+    if hasattr(storage, 'urls'):
+        return storage.urls(names)
+    return {name: storage.url(name) for name in dict.fromkeys(names) if name}
+
+
+def clear_url_cache():
+    _url_cache.clear()
+
+
+class AzureMediaStorage(CachedURLMixin, AzureStorage):
     """
     Custom storage class for media files (user uploads)
     Uses a separate container from static files
     """
-    account_name = settings.AZURE_ACCOUNT_NAME
-    account_key = settings.AZURE_ACCOUNT_KEY
-    azure_container = settings.AZURE_MEDIA_CONTAINER
+    account_name = getattr(settings, 'AZURE_ACCOUNT_NAME', None)
+    account_key = getattr(settings, 'AZURE_ACCOUNT_KEY', None)
+    azure_container = getattr(settings, 'AZURE_MEDIA_CONTAINER', 'media')
     expiration_secs = None
 
 
-class AzureStaticStorage(AzureStorage):
+class AzureStaticStorage(ManifestFilesMixin, CachedURLMixin, AzureStorage):
     """
     Custom storage class for static files (CSS, JS, app images)
     Uses a separate container from media files
+
+    {% static %} resolves to the content-hashed names recorded in the
+    container's staticfiles.json, written by collectstatic or syncstatic.
+    syncstatic uploads text assets gzipped; a ``content_encoding`` set on
+    the uploaded file becomes the blob's Content-Encoding.
     """
-    account_name = settings.AZURE_ACCOUNT_NAME
-    account_key = settings.AZURE_ACCOUNT_KEY
-    azure_container = settings.AZURE_STATIC_CONTAINER
+    account_name = getattr(settings, 'AZURE_ACCOUNT_NAME', None)
+    account_key = getattr(settings, 'AZURE_ACCOUNT_KEY', None)
+    azure_container = getattr(settings, 'AZURE_STATIC_CONTAINER', 'static')
     expiration_secs = None
+    overwrite_files = True
+    # Fall back to the plain name for anything not (yet) in the manifest
+    manifest_strict = False
+    supports_content_encoding = True
+
+    def _get_content_settings_parameters(self, name, content=None):
+        params = super()._get_content_settings_parameters(name, content)
+        encoding = getattr(content, 'content_encoding', None)
+        if encoding:
+            params['content_encoding'] = encoding
+        return params
+
+    def read_manifest(self):
+        # A missing blob isn't a FileNotFoundError here, e.g. on the first deploy
+        try:
+            return super().read_manifest()
+        except ResourceNotFoundError:
+            return None
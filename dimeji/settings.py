@@ -1,4 +1,6 @@
+import tempfile
 from pathlib import Path
+
 from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -29,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its total covers every other middleware
+    'website.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -42,7 +46,8 @@ ROOT_URLCONF = 'dimeji.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to PerformanceMiddleware
+        'BACKEND': 'website.performance.TimedDjangoTemplates',
         'DIRS': [ BASE_DIR / 'templates' ],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -58,6 +63,27 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'dimeji.wsgi.application'
 
+# Serve the read-only pages with async views. Turn on together with the ASGI
+# server (see gunicorn.conf.py); under WSGI each async view would need its
+# own event loop.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Request timing (see website/performance.py): the fraction of requests
+# timed, and how many recent requests per view the staff stats page keeps
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=0.0, cast=float)
+PERF_WINDOW = config('PERF_WINDOW', default=1000, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'website.performance': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # Use PostgreSQL for production (Azure), SQLite for development
 if config('DB_NAME', default=''):
     DATABASES = {
@@ -69,8 +95,15 @@ if config('DB_NAME', default=''):
             'HOST': config('DB_HOST'),
             'PORT': config('DB_PORT', default='5432'),
             'OPTIONS': {
-                'sslmode': 'require',
+                'sslmode': config('DB_SSLMODE', default='require'),
             },
+            # Reuse each worker's connection across requests instead of paying
+            # the TCP + TLS + auth handshake every time; health checks replace
+            # a connection the server dropped before the request uses it.
+            # Async views run their queries on a different thread per request,
+            # so persistent connections would pile up there and are never reused
+            'CONN_MAX_AGE': 0 if ASYNC_VIEWS else config('DB_CONN_MAX_AGE', default=600, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
         }
     }
 else:
@@ -81,10 +114,36 @@ else:
         }
     }
 
+# Cache (shared by all gunicorn workers so page invalidation reaches every process)
+if config('REDIS_URL', default=''):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=str(Path(tempfile.gettempdir()) / 'dimeji-cache')),
+        }
+    }
+
+# Public pages are cached until content changes (see website/cache.py)
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+# Minified CSS/JS written by `manage.py buildassets`; shadows the sources
+# when present, except in DEBUG where edits to static/ must show up directly
+ASSET_BUILD_DIR = BASE_DIR / 'build' / 'static'
+if not DEBUG and ASSET_BUILD_DIR.is_dir():
+    STATICFILES_DIRS.insert(0, ASSET_BUILD_DIR)
+# Per-template critical CSS written by `manage.py buildcritical`
+CRITICAL_CSS_FILE = BASE_DIR / 'build' / 'critical.json'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Media files (uploads)
@@ -122,6 +181,44 @@ else:
 
 
 
+# Email
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@dimroid.com')
+CONTACT_EMAIL = config('CONTACT_EMAIL', default='dimeji@dimroid.com')
+
+# Outbox delivery (see website/outbox.py and `manage.py process_outbox`)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_BACKOFF_SECONDS = config('OUTBOX_BACKOFF_SECONDS', default=30, cast=int)
+OUTBOX_MAX_BACKOFF_SECONDS = config('OUTBOX_MAX_BACKOFF_SECONDS', default=60 * 60, cast=int)
+
+# Digest mode: hold contact notifications this many seconds and merge them
+# into one summary email (0 sends each submission on its own)
+CONTACT_DIGEST_WINDOW = config('CONTACT_DIGEST_WINDOW', default=0, cast=int)
+CONTACT_DIGEST_PER_SENDER = config('CONTACT_DIGEST_PER_SENDER', default=3, cast=int)
+
+# Contact form abuse protection (see website/ratelimit.py)
+# Rates are "<hits>/<seconds>"; backend is memory, cache or db
+CONTACT_RATELIMIT_BACKEND = config('CONTACT_RATELIMIT_BACKEND', default='cache')
+CONTACT_RATELIMIT_IP = config('CONTACT_RATELIMIT_IP', default='5/600')
+CONTACT_RATELIMIT_EMAIL = config('CONTACT_RATELIMIT_EMAIL', default='3/3600')
+RATELIMIT_TRUST_X_FORWARDED_FOR = config('RATELIMIT_TRUST_X_FORWARDED_FOR', default=False, cast=bool)
+# Named so browsers don't autofill it the way they would a 'website' field
+CONTACT_HONEYPOT_FIELD = 'contact_hp_url'
+CONTACT_MIN_FILL_SECONDS = config('CONTACT_MIN_FILL_SECONDS', default=3, cast=int)
+CONTACT_FORM_MAX_AGE = 60 * 60 * 24
+
+# GitHub repository stats (see website/github.py and `manage.py refresh_github_stats`).
+# A token raises the API rate limit from 60 to 5000 requests an hour.
+GITHUB_API_URL = config('GITHUB_API_URL', default='https://api.github.com')
+GITHUB_TOKEN = config('GITHUB_TOKEN', default='')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,19 @@
+"""
+Gunicorn settings, read by both startup.sh and the Procfile.
+
+With ASYNC_VIEWS on, gunicorn manages uvicorn workers serving the ASGI
+application (one event loop per worker, so a slow client or a request
+waiting on I/O no longer holds the whole process); otherwise it runs its
+default sync workers on the WSGI application.
+"""
+
+# Module-level names are read as gunicorn settings, and "config" is one
+import decouple
+
+workers = decouple.config('WEB_CONCURRENCY', default=3, cast=int)
+
+if decouple.config('ASYNC_VIEWS', default=False, cast=bool):
+    wsgi_app = 'dimeji.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'dimeji.wsgi:application'
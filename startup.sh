@@ -3,11 +3,34 @@
 # Install dependencies
 pip install -r requirements.txt
 
-# Collect static files
-python manage.py collectstatic --noinput
+# Minify CSS/JS into build/static (picked up ahead of static/ when DEBUG is off)
+python manage.py buildassets
+
+# Collect static files. With Azure, only upload what changed since the last boot.
+if [ -n "$AZURE_ACCOUNT_NAME" ]; then
+    python manage.py syncstatic
+else
+    python manage.py collectstatic --noinput
+fi
 
 # Run migrations
 python manage.py migrate
 
-# Start Gunicorn server
-gunicorn --bind 0.0.0.0:8000 --workers 3 dimeji.wsgi:application
+# Work out each page's above-the-fold CSS for inlining (needs the database)
+python manage.py buildcritical
+
+# Build the related-projects graph on first boot (kept current on save)
+python manage.py rebuild_related --if-empty
+
+# Deliver queued contact emails in the background
+python manage.py process_outbox --loop &
+
+# Generate responsive image derivatives for uploads in the background
+python manage.py process_image_jobs --loop &
+
+# Refresh GitHub repository stats hourly in the background
+python manage.py refresh_github_stats --loop &
+
+# Start Gunicorn server: WEB_CONCURRENCY (default 3) sync workers on WSGI,
+# or uvicorn workers on ASGI when ASYNC_VIEWS is set (see gunicorn.conf.py)
+gunicorn --bind 0.0.0.0:8000
@@ -455,16 +455,18 @@ function debounce(func, wait) {
     };
 }
 
-// GitHub API for project stats (optional enhancement)
+// GitHub stats for a repository ("owner/repo"), served from the site's own
+// cache (refreshed by `manage.py refresh_github_stats`), never from api.github.com.
+// The endpoint is rendered into <body data-github-stats-url> by base.html
 async function fetchGitHubStats(repo) {
     try {
-        const response = await fetch(`https://api.github.com/repos/byigitt/${repo}`);
+        const url = `${document.body.dataset.githubStatsUrl}?repo=${encodeURIComponent(repo)}`;
+        const response = await fetch(url);
+        if (!response.ok) {
+            return null;
+        }
         const data = await response.json();
-        return {
-            stars: data.stargazers_count,
-            forks: data.forks_count,
-            language: data.language
-        };
+        return data.repos[repo] || null;
     } catch (error) {
         console.error('Error fetching GitHub stats:', error);
         return null;
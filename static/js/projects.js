@@ -0,0 +1,166 @@
+// Projects page: catalog loading, filtering and search.
+// Expects catalogUrl, placeholderImage, activeTech and searchActive from the page.
+let catalogRequest = null;
+
+function loadCatalog() {
+    if (!catalogRequest) {
+        catalogRequest = fetch(catalogUrl)
+            .then(response => response.json())
+            .then(data => data.projects);
+    }
+    return catalogRequest;
+}
+
+function filterProjects(projectsData, filter) {
+    if (activeTech) {
+        projectsData = projectsData.filter(project =>
+            project.tags.some(tag => tag.toLowerCase() === activeTech));
+    }
+    if (filter === 'featured') {
+        return projectsData.filter(project => project.featured);
+    } else if (filter !== 'all') {
+        return projectsData.filter(project => project.category === filter);
+    }
+    return projectsData;
+}
+
+// Override the projects array in main.js for this page
+window.addEventListener('DOMContentLoaded', function() {
+    // Clear the default projects and use the enhanced data
+    const projectsGrid = document.getElementById('projects-grid');
+    const filterButtons = document.querySelectorAll('.filter-btn');
+
+    function addReadMoreListeners(cards) {
+        const readMoreLinks = [];
+        cards.forEach(card => readMoreLinks.push(...card.querySelectorAll('.read-more')));
+        readMoreLinks.forEach(link => {
+            link.addEventListener('click', function() {
+                const descriptionContainer = this.parentElement;
+                const truncatedSpan = descriptionContainer.querySelector('.truncated-description');
+                const fullSpan = descriptionContainer.querySelector('.full-description');
+
+                if (fullSpan.style.display === 'none' || fullSpan.style.display === '') {
+                    // Show full description
+                    truncatedSpan.style.display = 'none';
+                    fullSpan.style.display = 'inline';
+                    this.textContent = 'Read Less';
+                } else {
+                    // Show truncated description
+                    fullSpan.style.display = 'none';
+                    truncatedSpan.style.display = 'inline';
+                    this.textContent = 'Read More';
+                }
+            });
+        });
+    }
+
+    function renderProjectsPage(projectsToShow, append = false) {
+        if (!append) {
+            projectsGrid.innerHTML = '';
+        }
+
+        const newCards = [];
+        projectsToShow.forEach((project, index) => {
+            const projectCard = createEnhancedProjectCard(project, index);
+            projectsGrid.appendChild(projectCard);
+            newCards.push(projectCard);
+        });
+
+        // Add read more functionality
+        addReadMoreListeners(newCards);
+
+        // Animate new cards
+        setTimeout(() => {
+            newCards.forEach((card, index) => {
+                setTimeout(() => {
+                    card.style.opacity = '1';
+                    card.style.transform = 'translateY(0)';
+                }, index * 100);
+            });
+        }, 50);
+    }
+
+    function createEnhancedProjectCard(project, index) {
+        const card = document.createElement('div');
+        card.className = 'project-card animate-on-scroll';
+        card.dataset.slug = project.slug;
+        card.style.animationDelay = `${index * 0.1}s`;
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+        card.style.transition = 'all 0.6s ease';
+
+        // Truncate description to 200 characters
+        const maxLength = 100;
+        const fullDescription = project.description;
+        const truncatedDescription = fullDescription.length > maxLength ?
+            fullDescription.substring(0, maxLength) + '...' : fullDescription;
+        const shouldShowReadMore = fullDescription.length > maxLength;
+
+        card.innerHTML = `
+            <div class="project-image">
+                <img src="${project.image || placeholderImage}"${project.srcset ? ` srcset="${project.srcset}" sizes="(max-width: 768px) 100vw, 400px"` : ''} alt="${project.title}" style="width: 100%; height: 100%; object-fit: cover;" loading="lazy">
+                ${project.featured ? '<div class="featured-badge"><i class="fas fa-star"></i> Featured</div>' : ''}
+            </div>
+            <div class="project-content">
+                <h3 class="project-title">${project.title}</h3>
+                <p class="project-description">
+                    <span class="truncated-description">${truncatedDescription}</span>
+                    <span class="full-description">${fullDescription}</span>
+                    ${shouldShowReadMore ? '<span class="read-more">Read More</span>' : ''}
+                </p>
+                <div class="project-tags">
+                    ${project.tags.map(tag => `<span class="project-tag">${tag}</span>`).join('')}
+                </div>
+                <div class="project-links">
+                    <a href="${project.github}" target="_blank" rel="noopener noreferrer" class="project-link">
+                        <i class="fab fa-github"></i>
+                        GitHub
+                    </a>
+                    ${project.live ? `
+                        <a href="${project.live}" target="_blank" rel="noopener noreferrer" class="project-link">
+                            <i class="fas fa-external-link-alt"></i>
+                            Live Demo
+                        </a>
+                    ` : ''}
+                </div>
+            </div>
+        `;
+
+        return card;
+    }
+
+    // Enhanced filter functionality
+    filterButtons.forEach(button => {
+        button.addEventListener('click', () => {
+            filterButtons.forEach(btn => btn.classList.remove('active'));
+            button.classList.add('active');
+
+            const filter = button.getAttribute('data-filter');
+
+            loadCatalog().then(projectsData => {
+                renderProjectsPage(filterProjects(projectsData, filter));
+            });
+        });
+    });
+
+    // Server-rendered cards only need their listeners; the rest of the
+    // current filter is appended once the catalog arrives
+    const serverCards = Array.from(projectsGrid.querySelectorAll('.project-card'));
+    addReadMoreListeners(serverCards);
+
+    const initialFilter = document.querySelector('.filter-btn.active').getAttribute('data-filter');
+    const renderedSlugs = new Set(serverCards.map(card => card.dataset.slug));
+    if (searchActive) {
+        // Search results are ranked server-side and already complete
+        return;
+    }
+    loadCatalog().then(projectsData => {
+        const activeFilter = document.querySelector('.filter-btn.active').getAttribute('data-filter');
+        if (activeFilter !== initialFilter) {
+            return;
+        }
+        const remaining = filterProjects(projectsData, initialFilter)
+            .filter(project => !renderedSlugs.has(project.slug));
+        renderProjectsPage(remaining, true);
+    });
+});
@@ -1,6 +1,10 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Project, ProjectImage, Technology, Contact
+from .cache import bump_generation
+from .exports import export_response, filter_contacts
+from .models import Project, ProjectImage, Technology, Contact, OutboxEmail, ImageJob, RepoStats
 
 
 class ProjectImageInline(admin.TabularInline):
@@ -43,7 +47,7 @@ class ProjectAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="width: 50px; height: 50px; object-fit: cover; border-radius: 4px;" />', obj.image.url)
+            return format_html('<img src="{}" style="width: 50px; height: 50px; object-fit: cover; border-radius: 4px;" />', obj.preview_url())
         return "No Image"
     image_preview.short_description = "Preview"
     
@@ -51,18 +55,22 @@ class ProjectAdmin(admin.ModelAdmin):
     
     def make_featured(self, request, queryset):
         queryset.update(featured=True)
+        transaction.on_commit(bump_generation)
     make_featured.short_description = "Mark selected projects as featured"
     
     def remove_featured(self, request, queryset):
         queryset.update(featured=False)
+        transaction.on_commit(bump_generation)
     remove_featured.short_description = "Remove featured status from selected projects"
     
     def make_visible(self, request, queryset):
         queryset.update(visible=True)
+        transaction.on_commit(bump_generation)
     make_visible.short_description = "Make selected projects visible"
     
     def make_hidden(self, request, queryset):
         queryset.update(visible=False)
+        transaction.on_commit(bump_generation)
     make_hidden.short_description = "Hide selected projects"
 
 
@@ -109,7 +117,7 @@ class ContactAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['mark_as_replied', 'mark_as_unread']
+    actions = ['mark_as_replied', 'mark_as_unread', 'export_csv', 'export_jsonl']
     
     def mark_as_replied(self, request, queryset):
         queryset.update(replied=True)
@@ -118,6 +126,16 @@ class ContactAdmin(admin.ModelAdmin):
     def mark_as_unread(self, request, queryset):
         queryset.update(replied=False)
     mark_as_unread.short_description = "Mark selected messages as unread"
+    
+    # The queryset already carries the changelist's date and replied/newsletter
+    # filters; the rows are streamed, never loaded all at once
+    def export_csv(self, request, queryset):
+        return export_response(filter_contacts(queryset), 'csv')
+    export_csv.short_description = "Export selected messages as CSV"
+    
+    def export_jsonl(self, request, queryset):
+        return export_response(filter_contacts(queryset), 'jsonl')
+    export_jsonl.short_description = "Export selected messages as JSON Lines"
 
 
 @admin.register(ProjectImage)
@@ -127,6 +145,59 @@ class ProjectImageAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="width: 50px; height: 50px; object-fit: cover; border-radius: 4px;" />', obj.image.url)
+            return format_html('<img src="{}" style="width: 50px; height: 50px; object-fit: cover; border-radius: 4px;" />', obj.preview_url())
         return "No Image"
     image_preview.short_description = "Preview"
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to', 'reply_to']
+    readonly_fields = ['contact', 'attempts', 'last_error', 'created_at', 'sent_at']
+    date_hierarchy = 'created_at'
+    
+    actions = ['retry_now']
+    
+    def retry_now(self, request, queryset):
+        queryset.exclude(status='sent').update(status='pending', next_attempt_at=timezone.now(), attempts=0)
+    retry_now.short_description = "Retry selected emails now"
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ['model_label', 'object_id', 'file_name', 'status', 'progress_bar', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'model_label', 'created_at']
+    search_fields = ['file_name', 'file_hash']
+    readonly_fields = ['model_label', 'object_id', 'field_name', 'file_name', 'file_hash', 'progress', 'attempts', 'last_error', 'created_at', 'started_at', 'finished_at']
+    date_hierarchy = 'created_at'
+    
+    def progress_bar(self, obj):
+        return format_html('<progress value="{}" max="100" title="{}%"></progress>', obj.progress, obj.progress)
+    progress_bar.short_description = "Progress"
+    
+    actions = ['retry_now']
+    
+    def retry_now(self, request, queryset):
+        queryset.exclude(status='done').update(status='pending', progress=0, attempts=0)
+    retry_now.short_description = "Retry selected jobs now"
+
+
+@admin.register(RepoStats)
+class RepoStatsAdmin(admin.ModelAdmin):
+    list_display = ['full_name', 'stars', 'forks', 'language', 'pushed_at', 'fetched_at', 'checked_at', 'has_error']
+    search_fields = ['full_name']
+    readonly_fields = ['stars', 'forks', 'language', 'pushed_at', 'etag', 'checked_at', 'fetched_at', 'last_error']
+    
+    def has_error(self, obj):
+        return bool(obj.last_error)
+    has_error.boolean = True
+    has_error.short_description = "Error"
+    
+    actions = ['force_refresh']
+    
+    def force_refresh(self, request, queryset):
+        # Without the ETag the next refresh does a full fetch
+        queryset.update(etag='')
+    force_refresh.short_description = "Fetch in full on the next refresh"
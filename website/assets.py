@@ -0,0 +1,170 @@
+"""
+Pure-Python minifiers for the site's own CSS and JavaScript.
+
+Both are conservative: they only drop comments and whitespace that cannot
+change meaning. The JS minifier keeps line breaks so automatic semicolon
+insertion behaves exactly as in the source.
+"""
+
+import re
+
+# Whitespace around these can always go in CSS. ':' is not in the list:
+# ".a :hover" and ".a:hover" select different things.
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+_CSS_DECLARATION = re.compile(r'(?<=[;{])([-\w]+):\s+')
+
+# After one of these, a '/' starts a regular expression, not a division.
+# '+' and '-' are left out: after "a++" or "b--" it is a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw')
+
+
+def _css_split(source):
+    """Yield ('string', text) and ('code', text) chunks with comments removed"""
+    i, n, start = 0, len(source), 0
+    while i < n:
+        char = source[i]
+        if char == '/' and source.startswith('/*', i):
+            yield 'code', source[start:i]
+            end = source.find('*/', i + 2)
+            i = start = n if end == -1 else end + 2
+        elif char in '"\'':
+            yield 'code', source[start:i]
+            j = i + 1
+            while j < n and source[j] != char:
+                j += 2 if source[j] == '\\' else 1
+            yield 'string', source[i:j + 1]
+            i = start = j + 1
+        else:
+            i += 1
+    yield 'code', source[start:]
+
+
+def minify_css(source):
+    out = []
+    for kind, text in _css_split(source):
+        if kind == 'code':
+            text = _CSS_PUNCTUATION.sub(r'\1', re.sub(r'\s+', ' ', text))
+            # Declarations: no space after the property's ':'
+            text = _CSS_DECLARATION.sub(r'\1:', text).replace(';}', '}')
+        out.append(text)
+    return ''.join(out).strip()
+
+
+def _skip_string(source, i, quote):
+    n = len(source)
+    j = i + 1
+    while j < n and source[j] != quote:
+        j += 2 if source[j] == '\\' else 1
+    return j + 1
+
+
+def _skip_regex(source, i):
+    n = len(source)
+    j = i + 1
+    in_class = False
+    while j < n:
+        char = source[j]
+        if char == '\\':
+            j += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            break
+        elif char == '\n':
+            break
+        j += 1
+    j += 1
+    while j < n and (source[j].isalnum() or source[j] == '_'):
+        j += 1
+    return j
+
+
+def _starts_regex(out):
+    code = ''.join(out[-3:]).rstrip()
+    if not code:
+        return True
+    if code[-1] in _REGEX_PRECEDERS:
+        return True
+    word = re.search(r'([A-Za-z_$][\w$]*)$', code)
+    return bool(word) and word.group(1) in _REGEX_KEYWORDS
+
+
+def minify_js(source):
+    """Strip comments and indentation, keeping strings, templates and regexes intact"""
+    out = []
+    # One entry per open template literal: the brace depth inside its ${...}
+    templates = []
+    i, n = 0, len(source)
+    while i < n:
+        char = source[i]
+        if templates and templates[-1] is None:
+            # Inside the literal text of a template string
+            j = i
+            while j < n and source[j] != '`' and not source.startswith('${', j):
+                j += 2 if source[j] == '\\' else 1
+            out.append(source[i:j])
+            if j >= n:
+                break
+            if source[j] == '`':
+                out.append('`')
+                templates.pop()
+                i = j + 1
+            else:
+                out.append('${')
+                templates[-1] = 0
+                i = j + 2
+            continue
+
+        if char in '"\'':
+            j = _skip_string(source, i, char)
+            out.append(source[i:j])
+            i = j
+        elif char == '`':
+            out.append('`')
+            templates.append(None)
+            i += 1
+        elif char == '/' and source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif char == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            comment = source[i:n if end == -1 else end]
+            out.append('\n' if '\n' in comment else ' ')
+            i = n if end == -1 else end + 2
+        elif char == '/' and _starts_regex(out):
+            j = _skip_regex(source, i)
+            out.append(source[i:j])
+            i = j
+        elif char in ' \t\r\n':
+            j = i
+            while j < n and source[j] in ' \t\r\n':
+                j += 1
+            out.append('\n' if '\n' in source[i:j] else ' ')
+            i = j
+        else:
+            if templates:
+                if char == '{':
+                    templates[-1] += 1
+                elif char == '}':
+                    if templates[-1] == 0:
+                        out.append('}')
+                        templates[-1] = None
+                        i += 1
+                        continue
+                    templates[-1] -= 1
+            out.append(char)
+            i += 1
+
+    lines = (line.strip() for line in ''.join(out).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
@@ -0,0 +1,213 @@
+"""
+Tools for the benchmark commands.
+
+A small asyncio HTTP/1.1 load generator: it speaks just enough HTTP to GET
+a page over a fresh connection and read the whole response, so thousands
+of concurrent clients cost one coroutine each rather than a thread. And
+LatencyProxy, a TCP proxy that delays traffic to make a local server
+behave like one across a network.
+"""
+
+import asyncio
+import threading
+import time
+
+
+async def http_get(host, port, path, timeout=30.0):
+    """GET ``path``; returns the status code (0 if the connection failed)"""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return 0
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+        status = int(head.split(b' ', 2)[1])
+        # Connection: close, so the body ends when the server hangs up
+        await asyncio.wait_for(reader.read(), timeout)
+        return status
+    except (OSError, ValueError, IndexError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return 0
+    finally:
+        writer.close()
+
+
+async def slow_client(host, port, path, stop, interval=1.0):
+    """
+    Hold a connection open by sending the request one header at a time,
+    ``interval`` seconds apart, until ``stop`` is set.
+    """
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'.encode())
+        count = 0
+        while not stop.is_set():
+            writer.write(f'X-Slow-{count}: 1\r\n'.encode())
+            await writer.drain()
+            count += 1
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+async def run_load(host, port, paths, concurrency, duration, slow_clients=0):
+    """
+    Keep ``concurrency`` clients requesting ``paths`` in turn for ``duration``
+    seconds, alongside ``slow_clients`` connections that never finish their
+    request. Returns a summary dict, with a breakdown per path under 'paths'.
+    """
+    stop = asyncio.Event()
+    slow = [asyncio.create_task(slow_client(host, port, paths[0], stop)) for _ in range(slow_clients)]
+    # Let the slow clients take their connections first
+    await asyncio.sleep(0.2 if slow_clients else 0)
+
+    latencies = {path: [] for path in paths}
+    errors = dict.fromkeys(paths, 0)
+    deadline = time.monotonic() + duration
+
+    async def client(offset):
+        i = offset
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            started = time.monotonic()
+            status = await http_get(host, port, path, timeout=duration)
+            if 200 <= status < 400:
+                latencies[path].append(time.monotonic() - started)
+            else:
+                errors[path] += 1
+            i += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.monotonic() - started
+    stop.set()
+    await asyncio.gather(*slow)
+
+    return {
+        'concurrency': concurrency,
+        'slow_clients': slow_clients,
+        'seconds': round(elapsed, 3),
+        **summarize([t for path in paths for t in latencies[path]], sum(errors.values()), elapsed),
+        'paths': {path: summarize(latencies[path], errors[path], elapsed) for path in paths},
+    }
+
+
+async def wait_for_port(host, port, timeout=30.0):
+    """Wait until something accepts connections on host:port"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return True
+    return False
+
+
+class LatencyProxy:
+    """
+    Forward a local port to ``target`` (host, port), delaying every chunk
+    by ``latency`` seconds in each direction, so one round trip costs
+    2 * latency. Runs its own event loop in a daemon thread:
+
+        with LatencyProxy(('db.local', 5432), latency=0.005) as proxy:
+            connect('127.0.0.1', proxy.port)
+    """
+
+    def __init__(self, target, latency):
+        self.target = target
+        self.latency = latency
+        self.port = None
+        self._closing = False
+        self._writers = set()
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, '127.0.0.1', 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        # Closing every connection lets the handlers run to the end; cancelling
+        # them instead gets each one's CancelledError logged by asyncio
+        self._closing = True
+        for writer in list(self._writers):
+            writer.close()
+        tasks = asyncio.all_tasks(self._loop)
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        server.close()
+        self._loop.run_until_complete(server.wait_closed())
+        self._loop.close()
+
+    async def _pump(self, reader, writer):
+        try:
+            while chunk := await reader.read(64 * 1024):
+                await asyncio.sleep(self.latency)
+                writer.write(chunk)
+                await writer.drain()
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        try:
+            server_reader, server_writer = await asyncio.open_connection(*self.target)
+        except OSError:
+            client_writer.close()
+            return
+        if self._closing:
+            client_writer.close()
+            server_writer.close()
+            return
+        writers = {client_writer, server_writer}
+        self._writers |= writers
+        try:
+            await asyncio.gather(
+                self._pump(client_reader, server_writer),
+                self._pump(server_reader, client_writer),
+            )
+        finally:
+            self._writers -= writers
+
@@ -0,0 +1,184 @@
+"""
+Versioned page cache for the public views.
+
+Every cached page is keyed on the request path, a whitelist of query
+parameters and the current content "generation". Saving or deleting a
+Project, ProjectImage or Technology bumps the generation (see signals.py),
+so all previously cached pages become unreachable at once instead of
+having to be found and deleted one by one.
+
+The decorator and generation lookups have async twins so the ASGI views
+can use the cache without leaving the event loop.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+GENERATION_KEY = 'website:generation'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def get_generation():
+    """Return the current content generation, initialising it if missing"""
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a cache flush can never bring an old
+        # generation (and the pages stored under it) back to life.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def aget_generation():
+    """Async version of get_generation()"""
+    cache = get_cache()
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Invalidate every cached page by moving to a new generation"""
+    cache = get_cache()
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+        return cache.get(GENERATION_KEY)
+
+
+class LRUCache:
+    """Small thread-safe, per-process LRU used in front of the shared cache"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def page_cache_key(request, vary_on=(), generation=None):
+    if generation is None:
+        generation = get_generation()
+    params = '&'.join(
+        f'{name}={value}'
+        for name in vary_on
+        for value in request.GET.getlist(name)
+    )
+    digest = hashlib.md5(f'{request.path}?{params}'.encode()).hexdigest()
+    return f'website:page:{generation}:{digest}'
+
+
+def _make_entry(response):
+    """The cacheable part of ``response``, or None if it must not be cached"""
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return None
+    return {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': '"%s"' % hashlib.md5(response.content).hexdigest(),
+        'last_modified': int(time.time()),
+    }
+
+
+def _cached_response(request, entry):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    patch_cache_control(response, no_cache=True)
+    return get_conditional_response(
+        request,
+        etag=entry['etag'],
+        last_modified=entry['last_modified'],
+        response=response,
+    )
+
+
+def versioned_cache_page(vary_on=(), timeout=None):
+    """
+    Cache a view's 200 responses under the current content generation.
+
+    ``vary_on`` lists the query parameters that change the rendered output;
+    any other parameter shares the same cache entry. Cached responses carry
+    a strong ETag and a Last-Modified date and answer conditional requests
+    with 304 Not Modified. Works on both sync and async views.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+
+                cache = get_cache()
+                key = page_cache_key(request, vary_on, await aget_generation())
+                entry = await cache.aget(key)
+
+                if entry is None:
+                    response = await view_func(request, *args, **kwargs)
+                    entry = _make_entry(response)
+                    if entry is None:
+                        return response
+                    await cache.aset(key, entry, timeout)
+                return _cached_response(request, entry)
+            return _wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            cache = get_cache()
+            key = page_cache_key(request, vary_on)
+            entry = cache.get(key)
+
+            if entry is None:
+                response = view_func(request, *args, **kwargs)
+                entry = _make_entry(response)
+                if entry is None:
+                    return response
+                cache.set(key, entry, timeout)
+            return _cached_response(request, entry)
+        return _wrapped_view
+    return decorator
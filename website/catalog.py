@@ -0,0 +1,111 @@
+"""
+Precomputed project catalog for the projects page.
+
+The projects page only renders the first screen of cards on the server;
+the rest of the catalog is shipped as a single JSON blob. The blob is
+built once per content generation (see cache.py), stored pre-gzipped in
+the shared cache and served under a content-addressed URL so browsers
+can cache it forever.
+"""
+
+import gzip
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from dimeji.custom_storages import bulk_urls
+
+from .cache import aget_generation, get_cache, get_generation
+from .images import build_srcset
+from .models import Project, ProjectTechnology
+
+# Public field name -> Project model field
+PROJECT_FIELDS = {
+    'title': 'title',
+    'description': 'description',
+    'tags': 'technologies',
+    'github': 'github_url',
+    'live': 'live_url',
+    'category': 'category',
+    'featured': 'featured',
+    'image': 'image',
+    'srcset': 'image_variants',
+    'slug': 'slug',
+}
+
+
+def technology_names(links):
+    """{project id: [technology names in order]} from a ProjectTechnology queryset"""
+    names = {}
+    for project_id, name in links.order_by('project_id', 'order').values_list('project_id', 'technology__name'):
+        names.setdefault(project_id, []).append(name)
+    return names
+
+
+def serialize_project_rows(rows, fields, tags=None):
+    """
+    Turn ``values()`` rows (which must include the id) into the public
+    project dicts. Tags come from the technology links: ``tags`` maps
+    project id to names, or they are fetched for the rows in one query.
+    """
+    image_storage = Project._meta.get_field('image').storage
+    rows = list(rows)
+    image_urls = bulk_urls(image_storage, [row['image'] for row in rows]) if 'image' in fields else {}
+    if 'tags' in fields and tags is None:
+        tags = technology_names(ProjectTechnology.objects.filter(project_id__in=[row['id'] for row in rows]))
+    projects_data = []
+    for row in rows:
+        project_dict = {}
+        for field in fields:
+            if field == 'tags':
+                project_dict[field] = tags.get(row['id'], [])
+                continue
+            value = row[PROJECT_FIELDS[field]]
+            if field == 'image':
+                value = image_urls.get(value)
+            elif field == 'srcset':
+                value = build_srcset(image_storage, value, 'webp') or None
+            project_dict[field] = value
+        projects_data.append(project_dict)
+    return projects_data
+
+
+def build_catalog():
+    """Serialize every visible project, returning (digest, raw, gzipped)"""
+    rows = Project.objects.filter(visible=True).values('id', *set(PROJECT_FIELDS.values()))
+    tags = technology_names(ProjectTechnology.objects.filter(project__visible=True))
+    payload = json.dumps(
+        {'projects': serialize_project_rows(rows, PROJECT_FIELDS, tags)},
+        cls=DjangoJSONEncoder,
+        separators=(',', ':'),
+    ).encode()
+    digest = hashlib.sha256(payload).hexdigest()[:16]
+    return digest, payload, gzip.compress(payload, compresslevel=9, mtime=0)
+
+
+def catalog_key(generation):
+    return f'website:catalog:{generation}'
+
+
+def get_catalog():
+    """Return the catalog for the current generation, building it at most once"""
+    cache = get_cache()
+    key = catalog_key(get_generation())
+    entry = cache.get(key)
+    if entry is None:
+        digest, raw, compressed = build_catalog()
+        entry = {'digest': digest, 'raw': raw, 'gzip': compressed}
+        # Unreachable once the generation moves on, so let it expire like the pages
+        cache.set(key, entry, getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24))
+    return entry
+
+
+async def aget_catalog():
+    """Async get_catalog(); only a rebuild leaves the event loop"""
+    entry = await get_cache().aget(catalog_key(await aget_generation()))
+    if entry is None:
+        entry = await sync_to_async(get_catalog)()
+    return entry
@@ -0,0 +1,172 @@
+"""
+Critical CSS: the subset of a stylesheet needed to paint the top of a page.
+
+``buildcritical`` renders each public page, takes the first FOLD_ELEMENTS
+elements of its body in document order as "above the fold", and keeps the
+rules whose selectors match any of them. The result is stored per
+template and stylesheet, together with the stylesheet's hash, in
+CRITICAL_CSS_FILE. The ``{% stylesheet %}`` tag inlines it and loads the
+full stylesheet without blocking rendering, but only while the hash still
+matches, so a changed stylesheet can never be paired with stale rules.
+"""
+
+import hashlib
+import json
+import re
+
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from soupsieve import SelectorSyntaxError
+
+from .assets import minify_css
+
+# Roughly the nav, the page heading and the first screen of content
+FOLD_ELEMENTS = 120
+
+# Dropped before matching: they depend on interaction or generate content,
+# so the element they hang off is what decides whether the rule is needed
+_DYNAMIC_PSEUDO = re.compile(
+    r'::?(?:hover|focus(?:-within|-visible)?|active|visited|link|target|checked|disabled|'
+    r'before|after|placeholder|selection|first-line|first-letter|marker|backdrop|'
+    r'-webkit-[\w-]+|-moz-[\w-]+|-ms-[\w-]+)(?:\([^)]*\))?'
+)
+_ALWAYS_KEEP_AT_RULES = ('@font-face', '@import', '@charset', '@property')
+_NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+
+def stylesheet_hash(content):
+    return hashlib.md5(content, usedforsecurity=False).hexdigest()[:12]
+
+
+def read_stylesheet(name):
+    """Bytes of the stylesheet that {% static name %} would serve, or None"""
+    path = finders.find(name)
+    if not path:
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _matching_brace(css, start):
+    depth = 0
+    i = start
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = css.index(char, i + 1) + 1 if char in css[i + 1:] else len(css)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css) - 1
+
+
+def parse_blocks(css):
+    """Split (minified) CSS into [(prelude, body)] top-level blocks"""
+    blocks = []
+    i = 0
+    while i < len(css):
+        open_brace = css.find('{', i)
+        semicolon = css.find(';', i)
+        if semicolon != -1 and (open_brace == -1 or semicolon < open_brace):
+            # Statement at-rule such as @import url(...);
+            blocks.append((css[i:semicolon + 1].strip(), None))
+            i = semicolon + 1
+            continue
+        if open_brace == -1:
+            break
+        close_brace = _matching_brace(css, open_brace)
+        blocks.append((css[i:open_brace].strip(), css[open_brace + 1:close_brace]))
+        i = close_brace + 1
+    return blocks
+
+
+def split_selectors(prelude):
+    """Split a selector list on commas outside parentheses"""
+    parts, depth, current = [], 0, ''
+    for char in prelude:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def above_the_fold(html, limit=FOLD_ELEMENTS):
+    """(soup, set of element ids) for the first ``limit`` body elements plus html/body"""
+    soup = BeautifulSoup(html, 'html.parser')
+    fold = {id(soup.html), id(soup.body)} if soup.body else set()
+    body = soup.body or soup
+    for count, element in enumerate(body.find_all(True)):
+        if count >= limit:
+            break
+        if element.name not in ('script', 'style', 'noscript'):
+            fold.add(id(element))
+    return soup, fold
+
+
+def _selector_needed(soup, fold, selector):
+    selector = _DYNAMIC_PSEUDO.sub('', selector).strip() or '*'
+    if selector[-1] in '>+~':
+        selector += ' *'
+    try:
+        return any(id(element) in fold for element in soup.select(selector))
+    except (SelectorSyntaxError, NotImplementedError, ValueError):
+        # Anything soupsieve can't evaluate is kept rather than risk a flash
+        return True
+
+
+def _only_custom_properties(body):
+    declarations = [d.strip() for d in body.split(';') if d.strip()]
+    return bool(declarations) and all(d.startswith('--') for d in declarations)
+
+
+def _filter_blocks(blocks, soup, fold, keyframes, animations):
+    kept = []
+    for prelude, body in blocks:
+        if body is None or prelude.startswith(_ALWAYS_KEEP_AT_RULES):
+            kept.append(f'{prelude}{{{body}}}' if body is not None else prelude)
+        elif prelude.startswith(_NESTED_AT_RULES):
+            inner = _filter_blocks(parse_blocks(body), soup, fold, keyframes, animations)
+            if inner:
+                kept.append(f'{prelude}{{{"".join(inner)}}}')
+        elif prelude.startswith(('@keyframes', '@-webkit-keyframes')):
+            # Only kept if a critical rule animates with it (decided at the end)
+            keyframes.setdefault(prelude.split()[-1], []).append(f'{prelude}{{{body}}}')
+        elif _only_custom_properties(body) or any(
+            _selector_needed(soup, fold, selector) for selector in split_selectors(prelude)
+        ):
+            # Theme variables are set on :root/[data-theme] and used everywhere
+            kept.append(f'{prelude}{{{body}}}')
+            for value in re.findall(r'animation(?:-name)?:([^;]+)', body):
+                animations.update(re.findall(r'[-\w]+', value))
+    return kept
+
+
+def extract_critical(html, css, limit=FOLD_ELEMENTS):
+    """The rules of ``css`` needed to render the top of ``html``"""
+    soup, fold = above_the_fold(html, limit)
+    keyframes, animations = {}, set()
+    kept = _filter_blocks(parse_blocks(minify_css(css)), soup, fold, keyframes, animations)
+    for name in sorted(animations & set(keyframes)):
+        kept.extend(keyframes[name])
+    return ''.join(kept)
+
+
+def load_critical_file():
+    try:
+        with open(settings.CRITICAL_CSS_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
@@ -0,0 +1,105 @@
+"""
+Cached slug -> project lookups for project_detail.
+
+Lookups go through a per-process LRU, then the shared cache, then the
+database. Entries are tagged with the content generation (see cache.py),
+so any project save, delete or slug change makes every worker's copy
+stale without needing to reach into other processes.
+
+aget_project_detail() is the same lookup for the async views, using the
+async ORM and cache APIs.
+"""
+
+from django.db.models import Prefetch
+
+from .cache import LRUCache, aget_generation, get_cache, get_generation
+from .models import Project, ProjectImage, RepoStats
+from .related import related_projects
+
+DETAIL_LRU_SIZE = 512
+
+# Cached for slugs that do not resolve, so 404 probes stay off the database
+MISSING = 'missing'
+
+_local = LRUCache(DETAIL_LRU_SIZE)
+
+
+def _detail_queryset(slug):
+    return (
+        Project.objects.filter(slug=slug, visible=True)
+        .prefetch_related(Prefetch('gallery_images', queryset=ProjectImage.objects.order_by('order')))
+    )
+
+
+def _stats_queryset(project):
+    return RepoStats.objects.filter(full_name=project.github_repo, fetched_at__isnull=False)
+
+
+def load_project_detail(slug):
+    """Fetch a visible project with its gallery and related projects"""
+    project = _detail_queryset(slug).first()
+    if project is None:
+        return MISSING
+    stats = _stats_queryset(project).first() if project.github_repo else None
+    return {
+        'project': project,
+        'related_projects': list(related_projects(project)),
+        'github_stats': stats.as_dict() if stats else None,
+    }
+
+
+async def aload_project_detail(slug):
+    """Async load_project_detail()"""
+    project = await _detail_queryset(slug).afirst()
+    if project is None:
+        return MISSING
+    stats = await _stats_queryset(project).afirst() if project.github_repo else None
+    return {
+        'project': project,
+        'related_projects': [related async for related in related_projects(project).aiterator()],
+        'github_stats': stats.as_dict() if stats else None,
+    }
+
+
+def _detail_key(generation, slug):
+    return f'website:project:{generation}:{slug}'
+
+
+def get_project_detail(slug):
+    """Return the detail context for ``slug``, or None if it does not exist"""
+    generation = get_generation()
+    entry = _local.get(slug)
+    if entry is None or entry[0] != generation:
+        cache = get_cache()
+        key = _detail_key(generation, slug)
+        detail = cache.get(key)
+        if detail is None:
+            detail = load_project_detail(slug)
+            cache.set(key, detail)
+        entry = (generation, detail)
+        _local.set(slug, entry)
+    detail = entry[1]
+    return None if detail == MISSING else detail
+
+
+async def aget_project_detail(slug):
+    """Async get_project_detail()"""
+    generation = await aget_generation()
+    entry = _local.get(slug)
+    if entry is None or entry[0] != generation:
+        cache = get_cache()
+        key = _detail_key(generation, slug)
+        detail = await cache.aget(key)
+        if detail is None:
+            detail = await aload_project_detail(slug)
+            await cache.aset(key, detail)
+        entry = (generation, detail)
+        _local.set(slug, entry)
+    detail = entry[1]
+    return None if detail == MISSING else detail
+
+
+def forget_project_detail(*slugs):
+    """Drop this process's copies right away (other workers follow the generation)"""
+    for slug in slugs:
+        _local.delete(slug)
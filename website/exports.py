@@ -0,0 +1,113 @@
+"""
+Streaming exports of contact submissions as CSV or JSON Lines.
+
+Rows come from values_list().iterator(chunk_size=...), so only one chunk
+of tuples is in memory at a time (a server-side cursor on PostgreSQL),
+and each line is encoded and handed to the response or file as soon as
+it is produced. Memory stays flat however many submissions there are.
+Filters are applied to the queryset before the scan; ordering by
+-created_at lets the date range walk contact_created_at_idx.
+"""
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+CONTACT_FIELDS = ['id', 'created_at', 'name', 'email', 'subject', 'message', 'newsletter', 'replied']
+CHUNK_SIZE = 2000
+
+
+def parse_bound(value, end=False):
+    """
+    Aware datetime for an ISO date or datetime. A bare date is the start of
+    that day, or with ``end`` the start of the next one, so an until date is
+    included in full. Returns None for an invalid value.
+    """
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is not None:
+        moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    else:
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            return None
+        if moment is None:
+            return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_contacts(queryset, since=None, until=None, replied=None, newsletter=None):
+    """Contacts created in [since, until), optionally by replied/newsletter flag, newest first"""
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+    if replied is not None:
+        queryset = queryset.filter(replied=replied)
+    if newsletter is not None:
+        queryset = queryset.filter(newsletter=newsletter)
+    return queryset.order_by('-created_at')
+
+
+def contact_rows(queryset, chunk_size=CHUNK_SIZE):
+    return queryset.values_list(*CONTACT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object for csv.writer that returns each line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def _spreadsheet_safe(value):
+    # Submissions are user input; stop spreadsheets from running "=..." as a formula
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CONTACT_FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else _spreadsheet_safe(value)
+            for value in row
+        ])
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(CONTACT_FIELDS, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+# format: (line generator, content type)
+FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'jsonl': (jsonl_lines, 'application/x-ndjson; charset=utf-8'),
+}
+
+
+def export_lines(queryset, format, chunk_size=CHUNK_SIZE):
+    lines, _ = FORMATS[format]
+    return lines(contact_rows(queryset, chunk_size))
+
+
+def export_response(queryset, format):
+    """StreamingHttpResponse download of ``queryset`` in ``format`` ('csv' or 'jsonl')"""
+    _, content_type = FORMATS[format]
+    response = StreamingHttpResponse(export_lines(queryset, format), content_type=content_type)
+    filename = f"contacts-{timezone.localdate():%Y%m%d}.{format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,127 @@
+"""
+Server-side copy of the GitHub stats shown on project pages.
+
+Visitors never talk to api.github.com: refresh_github_stats fetches every
+repository named in Project.github_url concurrently and stores the result
+in RepoStats. Requests are conditional (If-None-Match with the stored
+ETag), and GitHub does not count 304 responses against the rate limit, so
+a refresh where nothing changed is close to free.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import bump_generation
+from .models import Project, RepoStats, parse_github_repo
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 10
+
+
+def tracked_repos():
+    """Every distinct 'owner/repo' linked from a visible project"""
+    urls = Project.objects.filter(visible=True).values_list('github_url', flat=True)
+    return sorted({repo for repo in map(parse_github_repo, urls) if repo})
+
+
+def _headers(etag):
+    headers = {
+        'Accept': 'application/vnd.github+json',
+        'User-Agent': 'dimroid-portfolio',
+    }
+    if settings.GITHUB_TOKEN:
+        headers['Authorization'] = f'Bearer {settings.GITHUB_TOKEN}'
+    if etag:
+        headers['If-None-Match'] = etag
+    return headers
+
+
+def fetch_repo(session, full_name, etag=''):
+    """
+    GET one repository. Returns (status, data, etag): data is None for
+    304 Not Modified. Raises requests exceptions for network failures and
+    HTTP errors.
+    """
+    response = session.get(
+        f"{settings.GITHUB_API_URL.rstrip('/')}/repos/{full_name}",
+        headers=_headers(etag),
+        timeout=REQUEST_TIMEOUT,
+    )
+    if response.status_code == 304:
+        return 304, None, etag
+    response.raise_for_status()
+    return response.status_code, response.json(), response.headers.get('ETag', '')
+
+
+def apply_response(stats, data, etag, now):
+    """Copy an API payload onto ``stats``; returns True if anything visible changed"""
+    values = {
+        'stars': data.get('stargazers_count') or 0,
+        'forks': data.get('forks_count') or 0,
+        'language': data.get('language') or '',
+        'pushed_at': parse_datetime(data['pushed_at']) if data.get('pushed_at') else None,
+    }
+    changed = any(getattr(stats, field) != value for field, value in values.items())
+    for field, value in values.items():
+        setattr(stats, field, value)
+    stats.etag = etag
+    stats.checked_at = stats.fetched_at = now
+    stats.last_error = ''
+    return changed
+
+
+def refresh_stats(repos=None, workers=8):
+    """
+    Refresh RepoStats for ``repos`` (default: all tracked repos).
+
+    Returns (changed, not_modified, failed) counts. The page cache is
+    invalidated only when a visible value actually changed.
+    """
+    repos = tracked_repos() if repos is None else repos
+    existing = {stats.full_name: stats for stats in RepoStats.objects.filter(full_name__in=repos)}
+    stats_list = [existing.get(name) or RepoStats(full_name=name) for name in repos]
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        def fetch(stats):
+            try:
+                return fetch_repo(session, stats.full_name, stats.etag)
+            except (requests.RequestException, ValueError) as e:
+                return e
+        results = list(executor.map(fetch, stats_list))
+
+    now = timezone.now()
+    changed = not_modified = failed = 0
+    for stats, result in zip(stats_list, results):
+        if isinstance(result, Exception):
+            # Leave fetched_at alone: a repo that was never fetched has no stats to show
+            logger.warning('Could not refresh GitHub stats for %s: %s', stats.full_name, result)
+            stats.last_error = str(result)[:2000]
+            stats.checked_at = now
+            failed += 1
+        elif result[0] == 304:
+            stats.checked_at = stats.fetched_at = now
+            stats.last_error = ''
+            not_modified += 1
+        elif apply_response(stats, result[1], result[2], now):
+            changed += 1
+        else:
+            not_modified += 1
+        stats.save()
+
+    if changed:
+        bump_generation()
+    return changed, not_modified, failed
+
+
+def stats_for(repos):
+    """{'owner/repo': stats dict} for the given repos that have been fetched successfully"""
+    return {
+        stats.full_name: stats.as_dict()
+        for stats in RepoStats.objects.filter(full_name__in=repos, fetched_at__isnull=False)
+    }
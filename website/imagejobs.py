@@ -0,0 +1,158 @@
+"""
+Queue for image derivative generation.
+
+Saving a Project or ProjectImage only inserts an ImageJob row (in the
+same transaction as the save); the process_image_jobs command picks jobs
+up in batches. The worker process does all database and storage I/O,
+and hands the Pillow work (images.render_derivatives) to a process pool
+so a burst of gallery uploads is encoded on every core at once.
+
+Jobs are keyed by object, field and content hash: saving the same upload
+again reuses the existing row, and a job whose hash has already been
+rendered only records the new file name.
+"""
+
+import logging
+from concurrent.futures import as_completed
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import images
+from .cache import bump_generation
+from .models import ImageJob
+
+logger = logging.getLogger(__name__)
+
+# A running job not finished within this time is assumed to have lost its worker
+JOB_LEASE = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+
+# Field holding the automatic thumbnail, per model
+THUMBNAIL_FIELDS = {
+    'website.project': 'thumbnail',
+}
+
+
+def enqueue_image_job(instance, field_name='image', file_hash=''):
+    """Queue (or re-arm) the job for ``instance.<field_name>``; returns the job"""
+    job, _ = ImageJob.objects.update_or_create(
+        model_label=instance._meta.label_lower,
+        object_id=instance.pk,
+        field_name=field_name,
+        file_hash=file_hash,
+        defaults={
+            'file_name': getattr(instance, field_name).name,
+            'status': 'pending',
+            'progress': 0,
+            'attempts': 0,
+            'last_error': '',
+            'finished_at': None,
+        },
+    )
+    return job
+
+
+def claim_jobs(batch_size, now=None):
+    """Mark up to ``batch_size`` pending (or abandoned) jobs as running and return them"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        claimed = list(
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending') | Q(status='running', started_at__lt=now - JOB_LEASE))
+            .order_by('created_at')[:batch_size]
+        )
+        if claimed:
+            ImageJob.objects.filter(pk__in=[job.pk for job in claimed]).update(
+                status='running', started_at=now, progress=5
+            )
+    return claimed
+
+
+def set_progress(job, progress, **fields):
+    job.progress = progress
+    for name, value in fields.items():
+        setattr(job, name, value)
+    ImageJob.objects.filter(pk=job.pk).update(progress=progress, **fields)
+
+
+def finish_job(job):
+    set_progress(job, 100, status='done', finished_at=timezone.now())
+
+
+def fail_job(job, error):
+    job.attempts += 1
+    status = 'failed' if job.attempts >= MAX_ATTEMPTS else 'pending'
+    logger.warning('Image job %s failed (attempt %s): %s', job.pk, job.attempts, error)
+    set_progress(job, 0, status=status, attempts=job.attempts, last_error=str(error)[:2000])
+
+
+def load_target(job):
+    """The model instance a job refers to, or None if it is gone or the file was replaced"""
+    model = apps.get_model(job.model_label)
+    instance = model.objects.filter(pk=job.object_id).first()
+    if instance is None or getattr(instance, job.field_name).name != job.file_name:
+        return None
+    return instance
+
+
+def run_jobs(jobs, executor):
+    """
+    Process claimed ``jobs``, rendering on ``executor`` (any
+    concurrent.futures executor). Storage reads and writes stay in this
+    process. Returns (done, failed) counts.
+    """
+    done = failed = 0
+    pending = {}
+    for job in jobs:
+        try:
+            instance = load_target(job)
+            thumbnail_field = THUMBNAIL_FIELDS.get(job.model_label)
+            work = instance and images.plan(instance, job.field_name, thumbnail_field)
+            if not work:
+                # Deleted, superseded by a newer upload, or already processed
+                finish_job(job)
+                done += 1
+                continue
+            set_progress(job, 25)
+            if not work['render']:
+                images.apply(instance, work['digest'], None, job.field_name, thumbnail_field)
+                finish_job(job)
+                done += 1
+                continue
+            future = executor.submit(
+                images.render_derivatives, work['data'], thumbnail=work['fill_thumbnail']
+            )
+        except Exception as e:
+            fail_job(job, e)
+            failed += 1
+            continue
+        pending[future] = (job, instance, work['digest'], thumbnail_field)
+
+    for future in as_completed(pending):
+        job, instance, digest, thumbnail_field = pending[future]
+        try:
+            rendered = future.result()
+            set_progress(job, 75)
+            images.apply(instance, digest, rendered, job.field_name, thumbnail_field)
+        except Exception as e:
+            fail_job(job, e)
+            failed += 1
+        else:
+            finish_job(job)
+            done += 1
+    return done, failed
+
+
+def process_jobs(executor, batch_size=20):
+    """Claim and run one batch; returns (done, failed)"""
+    jobs = claim_jobs(batch_size)
+    if not jobs:
+        return 0, 0
+    done, failed = run_jobs(jobs, executor)
+    if done:
+        bump_generation()
+    return done, failed
@@ -0,0 +1,244 @@
+"""
+Responsive image derivatives for project images.
+
+Each uploaded image is resized to a fixed set of widths and encoded as
+WebP (and AVIF when Pillow supports it). Derivatives are stored through
+the field's own storage, so they end up next to the originals in
+MEDIA_ROOT or the Azure media container, under content-addressed names:
+re-uploading identical bytes reuses the existing files.
+
+The metadata (content hash, dimensions, derivative names) is kept in the
+model's ``image_variants`` JSON field and is what templates build
+``srcset`` attributes from. It also records the thumbnail generated from
+the image, if any, so a replaced image gets a fresh one while a
+thumbnail uploaded by hand is left alone.
+"""
+
+import hashlib
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+DERIVATIVE_WIDTHS = (320, 640, 1024, 1600)
+THUMBNAIL_WIDTH = 400
+DERIVATIVE_ROOT = 'derivatives'
+
+ENCODERS = {
+    'avif': {'format': 'AVIF', 'mime': 'image/avif', 'options': {'quality': 50, 'speed': 6}},
+    'webp': {'format': 'WEBP', 'mime': 'image/webp', 'options': {'quality': 80, 'method': 4}},
+}
+# Best compression first; the order is also the <source> order in <picture>
+FORMATS = tuple(fmt for fmt in ('avif', 'webp') if features.check(fmt))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _prepare(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    return image
+
+
+def _encode(image, fmt):
+    encoder = ENCODERS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, encoder['format'], **encoder['options'])
+    return buffer.getvalue()
+
+
+def _resize(image, width):
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def target_widths(original_width):
+    """Configured widths below the original, plus the original if it is smaller than the largest"""
+    widths = [w for w in DERIVATIVE_WIDTHS if w < original_width]
+    if original_width <= DERIVATIVE_WIDTHS[-1]:
+        widths.append(original_width)
+    return widths
+
+
+def render_derivatives(data, formats=FORMATS, thumbnail=False):
+    """
+    Decode ``data`` and encode every derivative. Pure CPU work with no
+    Django access, so it can run in a worker process.
+
+    Returns a dict with the source ``width``/``height``, ``variants`` as
+    a list of (fmt, width, height, bytes) and, if requested, ``thumbnail``
+    as WebP bytes.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = _prepare(source)
+        image.load()
+
+    variants = []
+    for width in target_widths(image.width):
+        resized = image if width == image.width else _resize(image, width)
+        for fmt in formats:
+            variants.append((fmt, width, resized.height, _encode(resized, fmt)))
+
+    result = {'width': image.width, 'height': image.height, 'variants': variants}
+    if thumbnail:
+        thumb = image if image.width <= THUMBNAIL_WIDTH else _resize(image, THUMBNAIL_WIDTH)
+        result['thumbnail'] = _encode(thumb, 'webp')
+    return result
+
+
+def derivative_name(digest, width, fmt):
+    return posixpath.join(DERIVATIVE_ROOT, digest[:2], digest, f'{width}w.{fmt}')
+
+
+def store_derivatives(storage, digest, rendered):
+    """Save rendered variants (skipping ones already stored) and return their metadata"""
+    sources = {}
+    for fmt, width, height, payload in rendered['variants']:
+        name = derivative_name(digest, width, fmt)
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(payload))
+        sources.setdefault(fmt, []).append({'name': name, 'width': width, 'height': height})
+    return {
+        'hash': digest,
+        'width': rendered['width'],
+        'height': rendered['height'],
+        'sources': sources,
+    }
+
+
+def needs_processing(field_file, variants):
+    """Cheap check: has this exact file already been processed?"""
+    return bool(field_file) and variants.get('source') != field_file.name
+
+
+def upload_hash(field_file):
+    """
+    Content hash of a file that is about to be uploaded, or '' once it has
+    been committed to storage (hashing it then would mean downloading it).
+    """
+    if not field_file or field_file._committed:
+        return ''
+    digest = hashlib.sha256()
+    for chunk in field_file.file.chunks():
+        digest.update(chunk)
+    field_file.file.seek(0)
+    return digest.hexdigest()
+
+
+def read_file(field_file):
+    field_file.open('rb')
+    try:
+        return field_file.read()
+    finally:
+        field_file.close()
+
+
+def thumbnail_source(variants, thumbnail):
+    """Hash of the image ``thumbnail`` was generated from, or None if it was uploaded by hand"""
+    record = variants.get('thumbnail')
+    if record:
+        return record['hash'] if record['name'] == thumbnail.name else None
+    # Generated before the record was kept: named after the source hash
+    digest = variants.get('hash')
+    if digest and posixpath.basename(thumbnail.name).startswith(digest[:16]):
+        return digest
+    return None
+
+
+def plan(instance, field_name='image', thumbnail_field=None):
+    """
+    Read the source file and work out what is left to do.
+
+    Returns None if the file was already processed, otherwise a dict with
+    the file ``data``, its ``digest`` and whether it needs to be
+    ``render``-ed and a thumbnail filled (``fill_thumbnail``): either
+    none is set or the one set was generated from a different image.
+    """
+    field_file = getattr(instance, field_name)
+    variants = instance.image_variants or {}
+    if not needs_processing(field_file, variants):
+        return None
+    data = read_file(field_file)
+    digest = content_hash(data)
+    fill_thumbnail = False
+    if thumbnail_field:
+        thumbnail = getattr(instance, thumbnail_field)
+        fill_thumbnail = not thumbnail or thumbnail_source(variants, thumbnail) not in (None, digest)
+    return {
+        'data': data,
+        'digest': digest,
+        'fill_thumbnail': fill_thumbnail,
+        'render': variants.get('hash') != digest or fill_thumbnail,
+    }
+
+
+def apply(instance, digest, rendered=None, field_name='image', thumbnail_field=None):
+    """Store ``rendered`` output (if any) and save the metadata on ``instance``"""
+    field_file = getattr(instance, field_name)
+    variants = instance.image_variants or {}
+    updates = {}
+    if rendered is not None:
+        if variants.get('hash') != digest:
+            generated = variants.get('thumbnail')
+            variants = store_derivatives(field_file.storage, digest, rendered)
+            if generated:
+                variants['thumbnail'] = generated
+        if 'thumbnail' in rendered:
+            thumb_field = getattr(instance, thumbnail_field)
+            thumb_name = thumb_field.field.generate_filename(instance, f'{digest[:16]}.webp')
+            updates[thumbnail_field] = thumb_field.storage.save(thumb_name, ContentFile(rendered['thumbnail']))
+            setattr(instance, thumbnail_field, updates[thumbnail_field])
+            variants['thumbnail'] = {'name': updates[thumbnail_field], 'hash': digest}
+
+    variants['source'] = field_file.name
+    updates['image_variants'] = variants
+    instance.image_variants = variants
+    # update() rather than save(): no signals, so no reprocessing loop
+    type(instance).objects.filter(pk=instance.pk).update(**updates)
+
+
+def process_image(instance, field_name='image', thumbnail_field=None):
+    """
+    Generate derivatives for ``instance.<field_name>`` in this process.
+
+    Skipped when the stored file is unchanged, and the (slow) encoding is
+    skipped when the content hash matches what was processed before.
+    Fills ``thumbnail_field`` when it is empty or holds a thumbnail
+    generated from an earlier image; one uploaded by hand is kept.
+    Returns True if anything was written.
+    """
+    work = plan(instance, field_name, thumbnail_field)
+    if work is None:
+        return False
+    rendered = None
+    if work['render']:
+        rendered = render_derivatives(work['data'], thumbnail=work['fill_thumbnail'])
+    apply(instance, work['digest'], rendered, field_name, thumbnail_field)
+    return True
+
+
+def build_srcset(storage, variants, fmt):
+    return ', '.join(
+        f"{storage.url(source['name'])} {source['width']}w"
+        for source in variants.get('sources', {}).get(fmt, [])
+    )
+
+
+def picture_sources(storage, variants):
+    """[(mime type, srcset)] for the <source> elements of a <picture>"""
+    return [
+        (ENCODERS[fmt]['mime'], build_srcset(storage, variants, fmt))
+        for fmt in FORMATS
+        if variants.get('sources', {}).get(fmt)
+    ]
+
+
+def smallest_url(storage, variants, fmt='webp'):
+    sources = variants.get('sources', {}).get(fmt)
+    if not sources:
+        return None
+    return storage.url(min(sources, key=lambda source: source['width'])['name'])
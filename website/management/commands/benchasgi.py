@@ -0,0 +1,91 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from website.benchmark import run_load, wait_for_port
+
+SERVERS = {
+    'wsgi': 'False',
+    'asgi': 'True',
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare concurrent-connection capacity of the sync WSGI and the uvicorn ASGI '
+        'setups: starts gunicorn each way against the configured database and drives '
+        'it with many concurrent (and optionally slow) clients.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', default='/,/project/,/api/projects/', help='Comma-separated paths to request')
+        parser.add_argument('--concurrency', default='10,100,500', help='Comma-separated client counts')
+        parser.add_argument('--slow-clients', type=int, default=0,
+                            help='Connections that trickle their headers and never finish')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per run')
+        parser.add_argument('--workers', type=int, default=3, help='Gunicorn workers, as in startup.sh')
+        parser.add_argument('--servers', default='wsgi,asgi', help='Which setups to run')
+
+    def handle(self, *args, **options):
+        paths = [p.strip() for p in options['paths'].split(',') if p.strip()]
+        levels = [int(c) for c in options['concurrency'].split(',')]
+        servers = [s.strip() for s in options['servers'].split(',')]
+        unknown = set(servers) - set(SERVERS)
+        if unknown:
+            raise CommandError(f"Unknown server(s): {', '.join(sorted(unknown))}")
+
+        results = []
+        for server in servers:
+            port = free_port()
+            process = self.start(server, port, options['workers'])
+            try:
+                if not asyncio.run(wait_for_port('127.0.0.1', port)):
+                    raise CommandError(f'{server} server did not start')
+                # Warm the page cache so both setups serve the same work
+                asyncio.run(run_load('127.0.0.1', port, paths, 1, 0.5))
+                for concurrency in levels:
+                    result = asyncio.run(run_load(
+                        '127.0.0.1', port, paths, concurrency, options['duration'], options['slow_clients'],
+                    ))
+                    result['server'] = server
+                    results.append(result)
+                    self.report(result)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    def start(self, server, port, workers):
+        env = {
+            **os.environ,
+            'ASYNC_VIEWS': SERVERS[server],
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'dimeji.settings'),
+        }
+        command = [
+            sys.executable, '-m', 'gunicorn',
+            '--config', str(settings.BASE_DIR / 'gunicorn.conf.py'),
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers),
+            '--log-level', 'warning',
+        ]
+        try:
+            return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+        except OSError as e:
+            raise CommandError(f'Could not start gunicorn: {e}')
+
+    def report(self, result):
+        self.stdout.write(
+            f"{result['server']:>4}  c={result['concurrency']:<5} slow={result['slow_clients']:<3} "
+            f"{result['rps']:>8} req/s  p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  "
+            f"p99 {result['p99_ms']}ms  errors {result['errors']}"
+        )
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from website.benchmark import LatencyProxy, percentile
+
+ALIAS = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the per-request database cost with and without persistent '
+        'connections. Runs simulated requests (request_started, one query, '
+        'request_finished, as Django does) against the configured PostgreSQL '
+        'server through a proxy that adds network latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per setup')
+        parser.add_argument('--latency', type=float, default=5.0,
+                            help='Added one-way latency in ms (Azure Postgres is typically 1-5ms away)')
+        parser.add_argument('--sslmode', help='Override sslmode, e.g. disable for a local server without TLS')
+        parser.add_argument('--max-age', type=int, default=600, help='CONN_MAX_AGE for the persistent run')
+
+    def handle(self, *args, **options):
+        base = connections.settings['default']
+        if base['ENGINE'] != 'django.db.backends.postgresql':
+            raise CommandError('Needs PostgreSQL: set DB_NAME, DB_HOST, ... (a local server is fine).')
+
+        target = (base['HOST'] or 'localhost', int(base['PORT'] or 5432))
+        with LatencyProxy(target, options['latency'] / 1000) as proxy:
+            setups = [
+                ('new connection per request', {'CONN_MAX_AGE': 0}),
+                (f"persistent (CONN_MAX_AGE={options['max_age']})",
+                 {'CONN_MAX_AGE': options['max_age'], 'CONN_HEALTH_CHECKS': True}),
+            ]
+            for label, overrides in setups:
+                settings_dict = {
+                    **base,
+                    **overrides,
+                    'HOST': '127.0.0.1',
+                    'PORT': str(proxy.port),
+                    'OPTIONS': {k: v for k, v in base['OPTIONS'].items() if k != 'pool'},
+                }
+                if options['sslmode']:
+                    settings_dict['OPTIONS']['sslmode'] = options['sslmode']
+                timings = self.run(settings_dict, options['requests'])
+                self.stdout.write(
+                    f"{label:<32} mean {sum(timings) / len(timings) * 1000:7.2f}ms  "
+                    f"p50 {percentile(timings, 0.5) * 1000:7.2f}ms  "
+                    f"p99 {percentile(timings, 0.99) * 1000:7.2f}ms"
+                )
+
+    def run(self, settings_dict, count):
+        connections.settings[ALIAS] = settings_dict
+        connection = connections[ALIAS]
+        timings = []
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                # close_old_connections() runs on both signals, exactly as for a real request
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                request_finished.send(sender=self.__class__)
+                timings.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+        return sorted(timings)
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from website.assets import MINIFIERS
+
+
+class Command(BaseCommand):
+    help = (
+        'Minify the CSS and JS under static/ into ASSET_BUILD_DIR. '
+        'Run before collectstatic/syncstatic.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(settings.BASE_DIR / 'static'), help='Directory to read assets from')
+        parser.add_argument('--output', default=str(settings.ASSET_BUILD_DIR), help='Directory to write minified assets to')
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        output = Path(options['output'])
+        written = set()
+        before = after = 0
+
+        for path in sorted(source.rglob('*')):
+            minify = MINIFIERS.get(path.suffix)
+            if minify is None or not path.is_file():
+                continue
+            original = path.read_bytes()
+            content = minify(original.decode()).encode()
+            target = output / path.relative_to(source)
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            # Leave unchanged files alone so their mtimes stay put
+            if not target.exists() or target.read_bytes() != content:
+                target.write_bytes(content)
+            written.add(target)
+            before += len(original)
+            after += len(content)
+            self.stdout.write(f'{path.relative_to(source)}: {len(original)} -> {len(content)} bytes')
+
+        # Drop outputs whose source was deleted or renamed
+        if output.is_dir():
+            for stale in [p for p in output.rglob('*') if p.is_file() and p not in written]:
+                stale.unlink()
+
+        self.stdout.write(f'Minified {before} -> {after} bytes')
@@ -0,0 +1,62 @@
+import inspect
+import json
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from website.cache import bump_generation
+from website.critical import FOLD_ELEMENTS, extract_critical, read_stylesheet, stylesheet_hash
+from website.models import Project
+from website.templatetags import critical
+
+PAGES = ['website:home', 'website:about', 'website:projects', 'website:contact']
+
+
+class Command(BaseCommand):
+    help = 'Work out the above-the-fold CSS of each public page for inlining (run after buildassets)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fold', type=int, default=FOLD_ELEMENTS, help='Body elements treated as above the fold')
+
+    def handle(self, *args, **options):
+        paths = [reverse(name) for name in PAGES]
+        project = Project.objects.filter(visible=True).first()
+        if project:
+            paths.append(project.get_absolute_url())
+
+        result = {}
+        factory = RequestFactory()
+        for path in paths:
+            html, used = self.render(factory, path)
+            for template_name, name in used:
+                content = read_stylesheet(name)
+                if content is None:
+                    raise CommandError(f'Stylesheet not found: {name}')
+                css = extract_critical(html, content.decode(), options['fold'])
+                result.setdefault(template_name, {})[name] = {'hash': stylesheet_hash(content), 'css': css}
+                self.stdout.write(f'{template_name} {name}: {len(content)} -> {len(css)} bytes inline')
+
+        output = Path(settings.CRITICAL_CSS_FILE)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, indent=1, sort_keys=True))
+        # Cached pages still carry the old <head>
+        bump_generation()
+
+    @staticmethod
+    def render(factory, path):
+        """Render ``path`` straight through its view, bypassing the page cache"""
+        match = resolve(path)
+        view = inspect.unwrap(match.func)
+        if iscoroutinefunction(view):
+            # ASYNC_VIEWS routes the read-only pages to their async versions
+            view = async_to_sync(view)
+        token = critical.collecting.set([])
+        try:
+            response = view(factory.get(path), *match.args, **match.kwargs)
+            return response.content.decode(), critical.collecting.get()
+        finally:
+            critical.collecting.reset(token)
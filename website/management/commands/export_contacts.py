@@ -0,0 +1,49 @@
+import argparse
+
+from django.core.management.base import BaseCommand, CommandError
+
+from website.exports import CHUNK_SIZE, FORMATS, export_lines, filter_contacts, parse_bound
+from website.models import Contact
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream contact submissions as CSV or JSON Lines to stdout or a file, newest first. '
+        'Rows are read in chunks, so memory stays flat however many there are.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--since', help='Earliest submission, ISO date or datetime (inclusive)')
+        parser.add_argument('--until', help='Latest submission, ISO date (inclusive) or datetime (exclusive)')
+        parser.add_argument(
+            '--replied', action=argparse.BooleanOptionalAction, help='Only replied (or with --no-replied, unreplied) messages',
+        )
+        parser.add_argument(
+            '--newsletter', action=argparse.BooleanOptionalAction, help='Only newsletter subscribers (or non-subscribers)',
+        )
+        parser.add_argument('--output', help='File to write (default stdout)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        bounds = {}
+        for name, end in (('since', False), ('until', True)):
+            if options[name]:
+                bounds[name] = parse_bound(options[name], end=end)
+                if bounds[name] is None:
+                    raise CommandError(f"--{name}: expected an ISO date or datetime, got {options[name]!r}")
+
+        queryset = filter_contacts(
+            Contact.objects.all(), replied=options['replied'], newsletter=options['newsletter'], **bounds,
+        )
+        lines = export_lines(queryset, options['format'], options['chunk_size'])
+        if options['output']:
+            count = 0
+            with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+                for count, line in enumerate(lines, start=1):
+                    f.write(line)
+            rows = count - 1 if options['format'] == 'csv' else count  # less the header
+            self.stderr.write(f"Exported {rows} contact(s) to {options['output']}")
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection, connections
+from django.test import override_settings
+
+from website.benchmark import run_load, wait_for_port
+from website.catalog import get_catalog
+from website.models import Project
+from website.synthetic import seed_catalog
+
+
+# The projects page links the catalog it was rendered with
+CATALOG_URL_RE = re.compile(r'/project/catalog-([0-9a-f]+)\.json')
+
+
+class LoadTestServer(ThreadedWSGIServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 turns bursts of connections into
+    # one-second SYN retries, which would dominate the tail latencies
+    request_queue_size = 1024
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the site: seed a throwaway test database with a synthetic '
+        'catalog, serve it in-process (or target a running server with --url-host) '
+        'and drive every public route with concurrent async clients. Reports req/s '
+        'and latency percentiles and writes them to a JSON file for comparison.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=200, help='Synthetic projects to seed')
+        parser.add_argument('--concurrency', default='10,50', help='Comma-separated client counts')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per concurrency level')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data')
+        parser.add_argument('--url-host', help='host:port of an already running server (skips seeding and serving)')
+        parser.add_argument('--output', help='JSON results file (default build/loadtest/<timestamp>.json)')
+        parser.add_argument('--compare', help='Earlier results file to compare against')
+
+    def handle(self, *args, **options):
+        levels = [int(c) for c in options['concurrency'].split(',')]
+        if options['url_host']:
+            host, _, port = options['url_host'].rpartition(':')
+            routes = self.target_routes(host, int(port))
+            results = self.drive(host, int(port), routes, levels, options['duration'])
+        else:
+            results = self.run_in_process(options, levels)
+
+        report = {
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'projects': None if options['url_host'] else options['projects'],
+            'target': options['url_host'] or 'in-process',
+            'duration': options['duration'],
+            'database': connection.vendor,
+            'async_views': settings.ASYNC_VIEWS,
+            'results': results,
+        }
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'build', 'loadtest', f"{datetime.now():%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f'Results written to {output}')
+
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def run_in_process(self, options, levels):
+        """Seed a fresh test database and cache, serve them from a thread and drive it"""
+        workdir = tempfile.mkdtemp(prefix='loadtest-')
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # Server threads each open their own connection; an in-memory
+            # database would be a different, empty one for each of them
+            test_settings['NAME'] = os.path.join(workdir, 'loadtest.sqlite3')
+        # The shared cache would otherwise serve the dev server's pages (and
+        # catalog) for the test data, and keep the test data's afterwards
+        caches = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(workdir, 'cache'),
+        }}
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        server = None
+        try:
+            with override_settings(CACHES=caches):
+                started = time.monotonic()
+                seed_catalog(options['projects'], seed=options['seed'])
+                self.stdout.write(f"Seeded {options['projects']} projects in {time.monotonic() - started:.1f}s")
+
+                server = LoadTestServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False)
+                server.set_app(WSGIHandler())
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                port = server.server_address[1]
+                if not asyncio.run(wait_for_port('127.0.0.1', port)):
+                    raise CommandError('In-process server did not start')
+                return self.drive('127.0.0.1', port, self.local_routes(), levels, options['duration'])
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def routes(self, catalog_digest=None, slugs=()):
+        """Every public GET route, with a few query variants and the given project pages"""
+        routes = [
+            '/',
+            '/about/',
+            '/contact/',
+            '/project/',
+            '/project/?category=web',
+            '/project/?tech=Python',
+            '/project/?q=dashboard',
+            '/api/projects/',
+            '/api/projects/?tech=Django&fields=title,slug',
+            '/api/projects/?q=tracker',
+            '/api/github-stats/',
+        ]
+        if catalog_digest:
+            routes.append(f'/project/catalog-{catalog_digest}.json')
+        return routes + [f'/project/{slug}/' for slug in slugs]
+
+    def local_routes(self):
+        """Routes for the projects in this process's database"""
+        if not Project.objects.exists():
+            return self.routes()
+        slugs = Project.objects.filter(visible=True).order_by('id').values_list('slug', flat=True)[:5]
+        return self.routes(get_catalog()['digest'], slugs)
+
+    def target_routes(self, host, port):
+        """
+        Routes for the projects the target server has: the catalog linked
+        from its projects page and the first few slugs from its API. The
+        local database may hold different projects, or none.
+        """
+        base = f'http://{host}:{port}'
+        try:
+            with requests.Session() as session:
+                page = session.get(f'{base}/project/', timeout=30)
+                page.raise_for_status()
+                api = session.get(f'{base}/api/projects/', params={'fields': 'slug', 'limit': 5}, timeout=30)
+                api.raise_for_status()
+                slugs = [project['slug'] for project in api.json()['projects']]
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            raise CommandError(f'Could not read the routes from {base}: {e}')
+        match = CATALOG_URL_RE.search(page.text)
+        return self.routes(match and match.group(1), slugs)
+
+    def drive(self, host, port, routes, levels, duration):
+        # One pass to warm the page cache, so every level measures the same state
+        asyncio.run(run_load(host, port, routes, 1, min(duration, 2.0)))
+        results = []
+        for concurrency in levels:
+            result = asyncio.run(run_load(host, port, routes, concurrency, duration))
+            results.append(result)
+            self.stdout.write(
+                f"c={concurrency:<5} {result['rps']:>8} req/s  p50 {result['p50_ms']}ms  "
+                f"p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  errors {result['errors']}"
+            )
+            slowest = sorted(result['paths'].items(), key=lambda item: -item[1]['p95_ms'])[:3]
+            for path, stats in slowest:
+                self.stdout.write(f"    {path:<45} p95 {stats['p95_ms']}ms  errors {stats['errors']}")
+        return results
+
+    def compare(self, filename, results):
+        with open(filename) as f:
+            previous = {r['concurrency']: r for r in json.load(f)['results']}
+        self.stdout.write(f'Compared with {filename}:')
+        for result in results:
+            before = previous.get(result['concurrency'])
+            if before is None:
+                continue
+            change = (result['rps'] - before['rps']) / before['rps'] * 100 if before['rps'] else 0.0
+            self.stdout.write(
+                f"c={result['concurrency']:<5} {before['rps']} -> {result['rps']} req/s ({change:+.1f}%)  "
+                f"p95 {before['p95_ms']} -> {result['p95_ms']}ms"
+            )
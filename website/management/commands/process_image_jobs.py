@@ -0,0 +1,40 @@
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+
+from website.imagejobs import process_jobs
+
+
+class Command(BaseCommand):
+    help = 'Generate image derivatives for queued uploads on a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Encoder processes (default: one per core)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Jobs claimed at once (default: 4 per worker)')
+        parser.add_argument('--loop', action='store_true', help='Keep polling until stopped')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls when idle')
+
+    def handle(self, *args, **options):
+        self.running = True
+        if options['loop']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        batch_size = options['batch_size'] or options['workers'] * 4
+
+        # spawn, not fork: children must not inherit the parent's DB connection
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=get_context('spawn')) as executor:
+            while True:
+                done, failed = process_jobs(executor, batch_size)
+                if done or failed:
+                    self.stdout.write(f'Processed {done} image(s), {failed} failed')
+                if not options['loop'] or not self.running:
+                    break
+                if not (done or failed):
+                    time.sleep(options['interval'])
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,33 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from website.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notification emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails per SMTP connection')
+        parser.add_argument('--loop', action='store_true', help='Keep polling until stopped')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls when idle')
+
+    def handle(self, *args, **options):
+        self.running = True
+        if options['loop']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        while True:
+            sent, failed = deliver_pending(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Delivered {sent} email(s), {failed} failed')
+            if not options['loop'] or not self.running:
+                break
+            if not (sent or failed):
+                time.sleep(options['interval'])
+
+    def stop(self, signum, frame):
+        self.running = False
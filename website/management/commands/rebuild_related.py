@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from website.models import RelatedProject
+from website.related import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed related-projects graph from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-empty',
+            action='store_true',
+            help='Only rebuild when no edges exist yet (safe to run on every boot)',
+        )
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and RelatedProject.objects.exists():
+            self.stdout.write('Related projects already built, skipping')
+            return
+
+        count = rebuild_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt related projects for {count} projects')
+        )
@@ -0,0 +1,37 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from website.github import refresh_stats
+
+
+class Command(BaseCommand):
+    help = 'Refresh the cached GitHub stats for every repository linked from a project'
+
+    def add_arguments(self, parser):
+        parser.add_argument('repos', nargs='*', help='owner/repo names (default: all linked repositories)')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent API requests')
+        parser.add_argument('--loop', action='store_true', help='Keep refreshing until stopped')
+        parser.add_argument('--interval', type=float, default=3600.0, help='Seconds between refreshes')
+
+    def handle(self, *args, **options):
+        self.running = True
+        if options['loop']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        while True:
+            changed, not_modified, failed = refresh_stats(options['repos'] or None, options['workers'])
+            self.stdout.write(f'GitHub stats: {changed} changed, {not_modified} unchanged, {failed} failed')
+            if not options['loop'] or not self.running:
+                break
+            # Sleep in short steps so SIGTERM isn't held up for an hour
+            deadline = time.monotonic() + options['interval']
+            while self.running and time.monotonic() < deadline:
+                time.sleep(min(1.0, deadline - time.monotonic()))
+            if not self.running:
+                break
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,138 @@
+import gzip
+import json
+import os
+import posixpath
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+
+from django.contrib.staticfiles.finders import get_finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+MANIFEST_VERSION = '1.1'
+
+# Uploaded gzipped to storages that can set Content-Encoding. A blob is
+# served the same bytes whatever the request's Accept-Encoding, so this is
+# gzip only: every browser accepts it, not every client accepts brotli.
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.json', '.map', '.svg', '.txt', '.xml'}
+
+
+def hashed_name(name, digest):
+    """Same naming scheme as Django's ManifestStaticFilesStorage: css/styles.<hash>.css"""
+    path, filename = posixpath.split(name)
+    root, ext = posixpath.splitext(filename)
+    return posixpath.join(path, f'{root}.{digest[:12]}{ext}')
+
+
+def gzip_bytes(content):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def manifest_hash(paths):
+    return md5(json.dumps(sorted(paths.items())).encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+class Command(BaseCommand):
+    help = (
+        'Upload changed static files to the static storage, in parallel. '
+        'A staticfiles.json manifest in the storage records what is already there.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16, help='Parallel uploads')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be uploaded')
+        parser.add_argument('--force', action='store_true', help='Ignore the stored manifest and upload everything')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        storage = staticfiles_storage
+        manifest_name = getattr(storage, 'manifest_name', 'staticfiles.json')
+
+        local = self.collect_local()
+        stored = {} if options['force'] else self.read_manifest(storage, manifest_name)
+        paths = {name: hashed_name(name, digest) for name, (_, digest) in local.items()}
+        changed = [name for name in local if stored.get(name) != paths[name]]
+
+        if not changed and set(stored) == set(paths):
+            self.stdout.write(f'Static files up to date ({len(local)} files, {time.monotonic() - started:.2f}s)')
+            return
+        if options['dry_run']:
+            for name in changed:
+                self.stdout.write(f'Would upload {name}')
+            return
+
+        # Every changed file goes up twice: under its plain name (for
+        # references that aren't rewritten) and under its hashed name, which
+        # never changes content and can be cached forever
+        uploads = [
+            (target, local[name][0])
+            for name in changed
+            for target in (name, paths[name])
+        ]
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            list(executor.map(lambda upload: self.upload(storage, *upload), uploads))
+
+        # Written last: if an upload fails, the next run retries it
+        payload = {'paths': paths, 'version': MANIFEST_VERSION, 'hash': manifest_hash(paths)}
+        self.upload_bytes(storage, manifest_name, json.dumps(payload).encode())
+        self.stdout.write(
+            f'Uploaded {len(changed)} changed file(s) of {len(local)} '
+            f'in {time.monotonic() - started:.2f}s'
+        )
+
+    def collect_local(self):
+        """{name: (absolute path, md5 hex)} for every file the finders see"""
+        found = {}
+        for finder in get_finders():
+            for path, source_storage in finder.list(['CVS', '.*', '*~']):
+                prefix = getattr(source_storage, 'prefix', None)
+                name = posixpath.join(prefix, path) if prefix else path
+                name = name.replace(os.sep, '/')
+                # First finder wins, as with collectstatic
+                if name not in found:
+                    found[name] = source_storage.path(path)
+        return {name: (filename, self.file_md5(filename)) for name, filename in found.items()}
+
+    @staticmethod
+    def file_md5(filename):
+        hasher = md5(usedforsecurity=False)
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def read_manifest(storage, manifest_name):
+        try:
+            if hasattr(storage, 'read_manifest'):
+                content = storage.read_manifest()
+            else:
+                with storage.open(manifest_name) as manifest:
+                    content = manifest.read().decode()
+            return json.loads(content).get('paths', {}) if content else {}
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def upload(self, storage, name, filename):
+        with open(filename, 'rb') as f:
+            content = f.read()
+        encoding = None
+        compressible = posixpath.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+        if compressible and getattr(storage, 'supports_content_encoding', False):
+            compressed = gzip_bytes(content)
+            if len(compressed) < len(content):
+                content, encoding = compressed, 'gzip'
+        self.upload_bytes(storage, name, content, encoding)
+
+    @staticmethod
+    def upload_bytes(storage, name, content, content_encoding=None):
+        # _save() writes to the exact name; save() would pick a new one if
+        # it exists. Storages that overwrite on upload skip the extra round trips.
+        if not getattr(storage, 'overwrite_files', False) and storage.exists(name):
+            storage.delete(name)
+        upload = ContentFile(content)
+        upload.content_encoding = content_encoding
+        storage._save(name, upload)
@@ -0,0 +1,93 @@
+import json
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .performance import ViewStats, install_query_recorder, start_timing, stop_timing
+
+logger = logging.getLogger('website.performance')
+
+# Shared by every request in this process; read by views.performance_stats
+view_stats = ViewStats(getattr(settings, 'PERF_WINDOW', 1000))
+
+
+def install_recorders():
+    # Connections opened before website.performance was imported missed connection_created
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+
+
+class PerformanceMiddleware:
+    """
+    Time a sample of requests (PERF_SAMPLE_RATE, 0.0-1.0): query count and
+    time, template time and total. Each sampled response gets a
+    Server-Timing header, a JSON log line on the website.performance
+    logger and an entry in the per-view rolling stats. With a sample rate
+    of 0 the middleware removes itself from the stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, 'PERF_SAMPLE_RATE', 0.0)
+        if not self.sample_rate:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        install_recorders()
+        timings, token = start_timing()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_timing(token)
+        self.finish(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        # The ORM runs in the thread sync_to_async uses, not this one
+        await sync_to_async(install_recorders)()
+        timings, token = start_timing()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_timing(token)
+        self.finish(request, response, timings)
+        return response
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def finish(self, request, response, timings):
+        total = timings.total
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"',
+            f'tpl;dur={timings.template * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ))
+        view_stats.add(view, timings, total)
+        logger.info(json.dumps({
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timings.queries,
+            'db_ms': round(timings.db * 1000, 2),
+            'template_ms': round(timings.template * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }))
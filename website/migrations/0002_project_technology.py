@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tech_links', to='website.project')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_links', to='website.technology')),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tech_stack',
+            field=models.ManyToManyField(blank=True, help_text='Kept in sync with the technologies field on save', related_name='projects', through='website.ProjectTechnology', to='website.technology'),
+        ),
+        migrations.AddIndex(
+            model_name='projecttechnology',
+            index=models.Index(fields=['technology', 'project'], name='projecttech_tech_project_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='projecttechnology',
+            constraint=models.UniqueConstraint(fields=('project', 'technology'), name='unique_project_technology'),
+        ),
+    ]
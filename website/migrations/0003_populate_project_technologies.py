@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def parse_technologies(value):
+    names = []
+    for tech in value.split(','):
+        tech = tech.strip()[:100]
+        if tech and tech not in names:
+            names.append(tech)
+    return names
+
+
+def populate_project_technologies(apps, schema_editor):
+    Project = apps.get_model('website', 'Project')
+    Technology = apps.get_model('website', 'Technology')
+    ProjectTechnology = apps.get_model('website', 'ProjectTechnology')
+
+    technologies = {tech.name: tech for tech in Technology.objects.all()}
+    links = []
+    for project in Project.objects.only('id', 'technologies').iterator():
+        for position, name in enumerate(parse_technologies(project.technologies)):
+            if name not in technologies:
+                technologies[name] = Technology.objects.create(name=name)
+            links.append(ProjectTechnology(project_id=project.id, technology=technologies[name], order=position))
+    ProjectTechnology.objects.bulk_create(links, batch_size=500, ignore_conflicts=True)
+
+
+def clear_project_technologies(apps, schema_editor):
+    apps.get_model('website', 'ProjectTechnology').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0002_project_technology'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_project_technologies, clear_project_technologies),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0003_populate_project_technologies'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['-created_at'], name='contact_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('visible', True)), fields=['order', '-featured', '-created_at', '-id'], name='project_visible_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('visible', True)), fields=['category', 'order', '-featured', '-created_at'], name='project_visible_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('featured', True), ('visible', True)), fields=['order', '-featured', '-created_at'], name='project_featured_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectimage',
+            index=models.Index(fields=['project', 'order'], name='projectimage_project_order_idx'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+import django.contrib.postgres.search
+import website.models
+from django.db import migrations
+
+FTS_TABLE = 'website_project_fts'
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, technologies, description,
+        content='website_project', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER website_project_fts_insert AFTER INSERT ON website_project BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, technologies, description)
+        VALUES (new.id, new.title, new.technologies, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER website_project_fts_delete AFTER DELETE ON website_project BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, technologies, description)
+        VALUES ('delete', old.id, old.title, old.technologies, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER website_project_fts_update
+    AFTER UPDATE OF title, technologies, description ON website_project BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, technologies, description)
+        VALUES ('delete', old.id, old.title, old.technologies, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, technologies, description)
+        VALUES (new.id, new.title, new.technologies, new.description);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS website_project_fts_insert',
+    'DROP TRIGGER IF EXISTS website_project_fts_delete',
+    'DROP TRIGGER IF EXISTS website_project_fts_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRESQL_FORWARD = [
+    """
+    UPDATE website_project SET search_vector =
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(technologies, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    """,
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_backend(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRESQL_FORWARD)
+
+
+def drop_search_backend(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0004_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Emits no DDL off PostgreSQL, see SearchVectorIndex
+        migrations.AddIndex(
+            model_name='project',
+            index=website.models.SearchVectorIndex(fields=['search_vector'], name='project_search_vector_idx'),
+        ),
+        migrations.RunPython(create_search_backend, drop_search_backend),
+    ]
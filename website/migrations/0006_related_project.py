@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0005_project_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='website.project')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_from', to='website.project')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['project', '-score'], name='related_project_score_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='relatedproject',
+            constraint=models.UniqueConstraint(fields=('project', 'related'), name='unique_related_project'),
+        ),
+    ]
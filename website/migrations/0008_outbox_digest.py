@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0007_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='digest',
+            field=models.ForeignKey(blank=True, help_text='Digest email this notification was merged into', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged', to='website.outboxemail'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed'), ('digested', 'Merged into digest')], default='pending', max_length=20),
+        ),
+    ]
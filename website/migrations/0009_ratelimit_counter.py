@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0008_outbox_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('bucket', models.BigIntegerField(help_text='Window number (unix time // window length)')),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='ratelimitcounter',
+            constraint=models.UniqueConstraint(fields=('key', 'bucket'), name='unique_ratelimit_bucket'),
+        ),
+    ]
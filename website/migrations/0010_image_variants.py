@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0009_ratelimit_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Responsive derivatives of the image (see images.py)'),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Responsive derivatives of the image (see images.py)'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0010_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='e.g. website.project', max_length=100)),
+                ('object_id', models.PositiveIntegerField()),
+                ('field_name', models.CharField(default='image', max_length=50)),
+                ('file_name', models.CharField(max_length=255)),
+                ('file_hash', models.CharField(blank=True, help_text='SHA-256 of the upload, if known when it was saved', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Percent complete')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='imagejob_pending_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='imagejob',
+            constraint=models.UniqueConstraint(fields=('model_label', 'object_id', 'field_name', 'file_hash'), name='unique_image_job'),
+        ),
+    ]
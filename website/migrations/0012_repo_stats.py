@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0011_image_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepoStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(help_text='owner/repo', max_length=200, unique=True)),
+                ('stars', models.PositiveIntegerField(default=0)),
+                ('forks', models.PositiveIntegerField(default=0)),
+                ('language', models.CharField(blank=True, max_length=100)),
+                ('pushed_at', models.DateTimeField(blank=True, help_text='Last push to the repository', null=True)),
+                ('etag', models.CharField(blank=True, help_text='Sent as If-None-Match on the next refresh', max_length=200)),
+                ('checked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Repository stats',
+                'verbose_name_plural': 'Repository stats',
+                'ordering': ['full_name'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+def backfill_fetched_at(apps, schema_editor):
+    # Rows whose last attempt succeeded; failed first fetches stay unset
+    RepoStats = apps.get_model('website', 'RepoStats')
+    RepoStats.objects.filter(checked_at__isnull=False, last_error='').update(fetched_at=models.F('checked_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0012_repo_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repostats',
+            name='fetched_at',
+            field=models.DateTimeField(blank=True, help_text='Last time GitHub answered; unset until then', null=True),
+        ),
+        migrations.AlterField(
+            model_name='repostats',
+            name='checked_at',
+            field=models.DateTimeField(blank=True, help_text='Last refresh attempt, successful or not', null=True),
+        ),
+        migrations.RunPython(backfill_fetched_at, migrations.RunPython.noop),
+    ]
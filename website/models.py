@@ -1,7 +1,50 @@
+from urllib.parse import urlsplit
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.backends.ddl_references import Statement
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 
+from . import images
+
+
+class SearchVectorIndex(GinIndex):
+    """
+    GIN index that only exists on PostgreSQL. SQLite searches through its
+    FTS5 table instead, so the DDL there is a no-op comment (table rebuilds
+    re-create every declared index).
+    """
+    
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return Statement('-- %(name)s is PostgreSQL only', name=self.name)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+    
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return Statement('-- %(name)s is PostgreSQL only', name=self.name)
+        return super().remove_sql(model, schema_editor, **kwargs)
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_technologies(self):
+        """Prefetch the ordered technology links in one extra query"""
+        return self.prefetch_related(
+            models.Prefetch(
+                'tech_links',
+                queryset=ProjectTechnology.objects.select_related('technology'),
+            )
+        )
+    
+    def using_technology(self, name):
+        """Projects linked to the named technology (case-insensitive)"""
+        technology_ids = Technology.objects.filter(name__iexact=name).values('id')
+        return self.filter(tech_links__technology__in=technology_ids)
+
+
 class Project(models.Model):
     CATEGORY_CHOICES = [
         ('web', 'Web Applications'),
@@ -31,9 +74,17 @@ class Project(models.Model):
     # Media
     image = models.ImageField(upload_to='projects/', blank=True, null=True, help_text="Project screenshot or logo")
     thumbnail = models.ImageField(upload_to='projects/thumbnails/', blank=True, null=True, help_text="Thumbnail image")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Responsive derivatives of the image (see images.py)")
     
     # Technical Details
     technologies = models.TextField(help_text="Comma-separated list of technologies used (e.g., Python, Django, React)")
+    tech_stack = models.ManyToManyField(
+        'Technology',
+        through='ProjectTechnology',
+        related_name='projects',
+        blank=True,
+        help_text="Kept in sync with the technologies field on save",
+    )
     
     # Metrics & Status
     status = models.CharField(max_length=20, choices=[
@@ -50,14 +101,39 @@ class Project(models.Model):
     order = models.PositiveIntegerField(default=0, help_text="Display order (lower numbers appear first)")
     visible = models.BooleanField(default=True, help_text="Show on website")
     
+    # Full-text search (PostgreSQL only; SQLite uses an FTS5 table instead)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ProjectQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', '-featured', '-created_at']
         verbose_name = 'Project'
         verbose_name_plural = 'Projects'
+        indexes = [
+            # Index-ordered scans for the public list queries. They are partial
+            # (WHERE visible) since hidden projects are never listed publicly.
+            models.Index(
+                fields=['order', '-featured', '-created_at', '-id'],
+                condition=models.Q(visible=True),
+                name='project_visible_order_idx',
+            ),
+            models.Index(
+                fields=['category', 'order', '-featured', '-created_at'],
+                condition=models.Q(visible=True),
+                name='project_visible_category_idx',
+            ),
+            models.Index(
+                fields=['order', '-featured', '-created_at'],
+                condition=models.Q(visible=True, featured=True),
+                name='project_featured_order_idx',
+            ),
+            SearchVectorIndex(fields=['search_vector'], name='project_search_vector_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -69,13 +145,56 @@ class Project(models.Model):
             # Create short description from main description if not provided
             self.short_description = self.description[:250] + '...' if len(self.description) > 250 else self.description
         super().save(*args, **kwargs)
+        self.sync_technologies()
     
     def get_absolute_url(self):
         return reverse('website:project_detail', kwargs={'slug': self.slug})
     
+    @property
+    def github_repo(self):
+        """'owner/repo' from github_url, or None"""
+        return parse_github_repo(self.github_url)
+    
     def get_technologies_list(self):
         """Return technologies as a list"""
-        return [tech.strip() for tech in self.technologies.split(',') if tech.strip()]
+        if 'tech_links' in getattr(self, '_prefetched_objects_cache', {}):
+            return [link.technology.name for link in self.tech_links.all()]
+        return parse_technologies(self.technologies)
+    
+    def sync_technologies(self):
+        """Mirror the comma-separated technologies field into tech_stack"""
+        names = parse_technologies(self.technologies)
+        current = list(
+            self.tech_links.order_by('order').values_list('technology__name', flat=True)
+        )
+        if current == names:
+            return
+        
+        technologies = {tech.name: tech for tech in Technology.objects.filter(name__in=names)}
+        missing = [Technology(name=name) for name in names if name not in technologies]
+        if missing:
+            Technology.objects.bulk_create(missing, ignore_conflicts=True)
+            technologies.update(
+                (tech.name, tech) for tech in Technology.objects.filter(name__in=names)
+            )
+        
+        self.tech_links.all().delete()
+        ProjectTechnology.objects.bulk_create([
+            ProjectTechnology(project=self, technology=technologies[name], order=position)
+            for position, name in enumerate(names)
+        ])
+        if hasattr(self, '_prefetched_objects_cache'):
+            self._prefetched_objects_cache.pop('tech_links', None)
+    
+    def image_sources(self):
+        """(mime type, srcset) pairs for <picture> sources"""
+        return images.picture_sources(self.image.storage, self.image_variants)
+    
+    def preview_url(self):
+        """Smallest available rendition, for admin lists and thumbnails"""
+        if self.thumbnail:
+            return self.thumbnail.url
+        return images.smallest_url(self.image.storage, self.image_variants) or self.image.url
     
     @property
     def is_featured(self):
@@ -86,18 +205,90 @@ class Project(models.Model):
         return bool(self.live_url)
 
 
+def parse_technologies(value):
+    """Split a comma-separated technologies string, dropping blanks and duplicates"""
+    names = []
+    for tech in value.split(','):
+        tech = tech.strip()[:100]
+        if tech and tech not in names:
+            names.append(tech)
+    return names
+
+
+def parse_github_repo(url):
+    """'owner/repo' for a github.com repository URL, else None"""
+    parsed = urlsplit(url or '')
+    if parsed.netloc.lower() not in ('github.com', 'www.github.com'):
+        return None
+    parts = [part for part in parsed.path.split('/') if part]
+    if len(parts) < 2:
+        return None
+    repo = parts[1][:-4] if parts[1].endswith('.git') else parts[1]
+    return f'{parts[0]}/{repo}'
+
+
+class ProjectTechnology(models.Model):
+    """Ordered link between a project and a technology it uses"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='tech_links')
+    technology = models.ForeignKey('Technology', on_delete=models.CASCADE, related_name='project_links')
+    order = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['order']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'technology'], name='unique_project_technology'),
+        ]
+        indexes = [
+            # "Projects using X" lookups start from the technology side
+            models.Index(fields=['technology', 'project'], name='projecttech_tech_project_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project} - {self.technology}"
+
+
+class RelatedProject(models.Model):
+    """Precomputed similarity edge used for a project's "related" list"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_from')
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'related'], name='unique_related_project'),
+        ]
+        indexes = [
+            models.Index(fields=['project', '-score'], name='related_project_score_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project} -> {self.related} ({self.score:.2f})"
+
+
 class ProjectImage(models.Model):
     """Additional images for projects (gallery)"""
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='gallery_images')
     image = models.ImageField(upload_to='projects/gallery/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Responsive derivatives of the image (see images.py)")
     caption = models.CharField(max_length=200, blank=True)
     order = models.PositiveIntegerField(default=0)
     
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['project', 'order'], name='projectimage_project_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.project.title} - Image {self.order}"
+    
+    def image_sources(self):
+        """(mime type, srcset) pairs for <picture> sources"""
+        return images.picture_sources(self.image.storage, self.image_variants)
+    
+    def preview_url(self):
+        return images.smallest_url(self.image.storage, self.image_variants) or self.image.url
 
 
 class Technology(models.Model):
@@ -142,6 +333,141 @@ class Contact(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='contact_created_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.subject}"
+
+
+class OutboxEmail(models.Model):
+    """Queued notification email, delivered by the process_outbox command"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('digested', 'Merged into digest'),
+    ]
+    
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.TextField(help_text="Comma-separated recipient addresses")
+    reply_to = models.EmailField(blank=True)
+    contact = models.ForeignKey(Contact, on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications')
+    digest = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='merged', help_text="Digest email this notification was merged into")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Outbox email'
+        indexes = [
+            # The worker only ever looks for pending rows that are due
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='pending'),
+                name='outbox_pending_due_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+    
+    def recipients(self):
+        return [address.strip() for address in self.to.split(',') if address.strip()]
+
+
+class RateLimitCounter(models.Model):
+    """Per-key hit counter for one fixed window (database rate limit backend)"""
+    key = models.CharField(max_length=255)
+    bucket = models.BigIntegerField(help_text="Window number (unix time // window length)")
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'bucket'], name='unique_ratelimit_bucket'),
+        ]
+    
+    def __str__(self):
+        return f"{self.key} @ {self.bucket}: {self.count}"
+
+
+class ImageJob(models.Model):
+    """Pending derivative generation for one image field, run by process_image_jobs"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    model_label = models.CharField(max_length=100, help_text="e.g. website.project")
+    object_id = models.PositiveIntegerField()
+    field_name = models.CharField(max_length=50, default='image')
+    file_name = models.CharField(max_length=255)
+    file_hash = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the upload, if known when it was saved")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent complete")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # Re-saving the same upload never queues the work twice
+            models.UniqueConstraint(
+                fields=['model_label', 'object_id', 'field_name', 'file_hash'],
+                name='unique_image_job',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='pending'),
+                name='imagejob_pending_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.model_label}:{self.object_id} {self.field_name} ({self.status})"
+
+
+class RepoStats(models.Model):
+    """GitHub repository stats, refreshed by the refresh_github_stats command"""
+    full_name = models.CharField(max_length=200, unique=True, help_text="owner/repo")
+    stars = models.PositiveIntegerField(default=0)
+    forks = models.PositiveIntegerField(default=0)
+    language = models.CharField(max_length=100, blank=True)
+    pushed_at = models.DateTimeField(blank=True, null=True, help_text="Last push to the repository")
+    
+    etag = models.CharField(max_length=200, blank=True, help_text="Sent as If-None-Match on the next refresh")
+    checked_at = models.DateTimeField(blank=True, null=True, help_text="Last refresh attempt, successful or not")
+    fetched_at = models.DateTimeField(blank=True, null=True, help_text="Last time GitHub answered; unset until then")
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['full_name']
+        verbose_name = 'Repository stats'
+        verbose_name_plural = 'Repository stats'
+    
+    def __str__(self):
+        return f"{self.full_name} ({self.stars} stars)"
+    
+    def as_dict(self):
+        return {
+            'stars': self.stars,
+            'forks': self.forks,
+            'language': self.language,
+            'pushed_at': self.pushed_at.isoformat() if self.pushed_at else None,
+        }
@@ -0,0 +1,185 @@
+"""
+Durable outbox for notification emails.
+
+Requests only insert an OutboxEmail row (in the same transaction as the
+Contact it describes); the process_outbox command delivers them later
+over a single SMTP connection per batch, retrying failures with
+exponential backoff.
+
+With CONTACT_DIGEST_WINDOW set, contact notifications are held for that
+many seconds and everything that arrived in the meantime is merged into
+one summary email, listing at most CONTACT_DIGEST_PER_SENDER messages
+from any one address.
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# A claimed row is invisible to other workers for this long; if the worker
+# dies mid-send the row simply becomes due again afterwards
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def enqueue_contact_notification(contact):
+    """Queue the notification email for a new Contact submission"""
+    # In digest mode the row waits out the window so it can be merged
+    delay = timedelta(seconds=settings.CONTACT_DIGEST_WINDOW)
+    return OutboxEmail.objects.create(
+        subject=f'Portfolio Contact: {contact.subject}',
+        body=f'From: {contact.name} ({contact.email})\n\nMessage:\n{contact.message}',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=settings.CONTACT_EMAIL,
+        reply_to=contact.email,
+        contact=contact,
+        next_attempt_at=timezone.now() + delay,
+    )
+
+
+def build_digest_body(notifications, per_sender):
+    by_sender = OrderedDict()
+    for email in notifications:
+        by_sender.setdefault(email.reply_to.lower(), []).append(email)
+
+    sections = []
+    for sender, emails in by_sender.items():
+        shown = emails[:per_sender]
+        sections.extend(email.body for email in shown)
+        if len(emails) > len(shown):
+            sections.append(f'... and {len(emails) - len(shown)} more message(s) from {sender}')
+    return '\n\n' + ('\n\n' + '-' * 40 + '\n\n').join(sections)
+
+
+def coalesce_due(now=None):
+    """
+    Merge pending contact notifications into a single digest email.
+
+    Runs once the oldest pending notification's window has elapsed and
+    takes every pending notification, due or not. A lone notification is
+    left to be sent as is. Returns the digest row, if one was created.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        pending = OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+            status='pending', attempts=0, contact__isnull=False,
+        )
+        if not pending.filter(next_attempt_at__lte=now).exists():
+            return None
+        notifications = list(pending.order_by('created_at'))
+        if len(notifications) < 2:
+            return None
+
+        senders = len({email.reply_to.lower() for email in notifications})
+        digest = OutboxEmail.objects.create(
+            subject=f'Portfolio Contact digest: {len(notifications)} new messages from {senders} sender(s)',
+            body=f'{len(notifications)} contact form submissions:' + build_digest_body(
+                notifications, settings.CONTACT_DIGEST_PER_SENDER
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=settings.CONTACT_EMAIL,
+            next_attempt_at=now,
+        )
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in notifications]).update(
+            status='digested', digest=digest
+        )
+    return digest
+
+
+def backoff_delay(attempts):
+    """Delay before retry number ``attempts`` (1-based), capped"""
+    delay = settings.OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+def claim_due(batch_size, now=None):
+    """Lease up to ``batch_size`` due rows to this worker and return them"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        claimed = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if claimed:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in claimed]).update(
+                next_attempt_at=now + CLAIM_LEASE
+            )
+    return claimed
+
+
+def build_message(email, connection):
+    return EmailMessage(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipients(),
+        reply_to=[email.reply_to] if email.reply_to else None,
+        connection=connection,
+    )
+
+
+def record_failure(email, error, now=None):
+    now = now or timezone.now()
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+        logger.error('Giving up on outbox email %s after %s attempts: %s', email.pk, email.attempts, error)
+    else:
+        email.next_attempt_at = now + backoff_delay(email.attempts)
+        logger.warning('Outbox email %s failed (attempt %s), retrying: %s', email.pk, email.attempts, error)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def record_success(email, now=None):
+    email.status = 'sent'
+    email.sent_at = now or timezone.now()
+    email.attempts += 1
+    email.last_error = ''
+    email.save(update_fields=['status', 'sent_at', 'attempts', 'last_error'])
+
+
+def deliver_pending(batch_size=50):
+    """
+    Deliver one batch of due emails, returning (sent, failed) counts.
+
+    The whole batch shares one backend connection. If it cannot even be
+    opened, every claimed row is rescheduled.
+    """
+    if settings.CONTACT_DIGEST_WINDOW:
+        coalesce_due()
+    emails = claim_due(batch_size)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            record_failure(email, e)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            try:
+                build_message(email, connection).send()
+            except Exception as e:
+                record_failure(email, e)
+                failed += 1
+            else:
+                record_success(email)
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
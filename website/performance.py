@@ -0,0 +1,138 @@
+"""
+Per-request timing: database queries, template rendering and the total.
+
+PerformanceMiddleware opens a RequestTimings for a sampled request and
+publishes it in a ContextVar. A query wrapper installed on every database
+connection and the TimedDjangoTemplates backend add to it while it is
+set; outside sampled requests they only read the ContextVar. ContextVars
+follow async views into sync_to_async threads, so queries run by the
+async ORM are counted too.
+
+Finished requests go into ViewStats, a rolling window of recent requests
+per view, for the staff-only performance endpoint.
+"""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('started', 'queries', 'db', 'template')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def start_timing():
+    """Begin timing this request; returns (timings, token for stop_timing)"""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def stop_timing(token):
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """connection.execute_wrapper hook"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, adding render time to the current request's timings"""
+
+    # The parent's lookup keeps its TemplateDoesNotExist handling (tried
+    # paths and backend for the debug page); only the wrapper is swapped
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class ViewStats:
+    """Thread-safe rolling window of the last ``window`` requests per view"""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def add(self, view, timings, total):
+        sample = (total, timings.db, timings.template, timings.queries)
+        with self._lock:
+            samples = self._views.get(view)
+            if samples is None:
+                samples = self._views[view] = deque(maxlen=self.window)
+            samples.append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def summary(self):
+        """{view: {'count', 'p50_ms', 'p95_ms', 'p99_ms', mean db/template ms and queries}}"""
+        with self._lock:
+            views = {view: list(samples) for view, samples in self._views.items()}
+        result = {}
+        for view, samples in sorted(views.items()):
+            totals = sorted(sample[0] for sample in samples)
+            count = len(samples)
+            result[view] = {
+                'count': count,
+                'p50_ms': round(percentile(totals, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(totals, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(totals, 0.99) * 1000, 2),
+                'db_ms': round(sum(sample[1] for sample in samples) / count * 1000, 2),
+                'template_ms': round(sum(sample[2] for sample in samples) / count * 1000, 2),
+                'queries': round(sum(sample[3] for sample in samples) / count, 2),
+            }
+        return result
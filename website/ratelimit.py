@@ -0,0 +1,178 @@
+"""
+Sliding-window rate limiting and cheap bot checks for the contact form.
+
+Storage is pluggable (CONTACT_RATELIMIT_BACKEND):
+
+- ``memory``: exact sliding log per key, only correct for a single process
+- ``cache``: sliding window counter in the shared cache (the default, so
+  all gunicorn workers see the same counts)
+- ``db``: the same counter kept in the RateLimitCounter table
+
+Everything here runs before the contact view touches the ORM (the ``db``
+backend aside), so rejected requests never open a transaction.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .cache import get_cache
+
+FORM_TIMESTAMP_SALT = 'website.contact.form-timestamp'
+
+
+def parse_rate(rate):
+    """Parse ``'5/600'`` into (5, 600.0): 5 hits per 600 seconds"""
+    limit, window = rate.split('/')
+    return int(limit), float(window)
+
+
+class MemoryBackend:
+    """Exact sliding log; per-process, so only for a single worker"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, window, now):
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                if len(self._hits) >= self.max_keys:
+                    self._prune(now, window)
+                hits = self._hits[key] = deque()
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            hits.append(now)
+            return len(hits), hits[0] + window - now
+
+    def _prune(self, now, window):
+        for key in [k for k, hits in self._hits.items() if not hits or hits[-1] <= now - window]:
+            del self._hits[key]
+        if len(self._hits) >= self.max_keys:
+            self._hits.clear()
+
+
+class SlidingCounterBackend:
+    """
+    Sliding window counter: the previous fixed window's count is weighted by
+    how much of it still overlaps the sliding window. Two counters per key
+    instead of a full log, at the cost of a small approximation.
+    """
+
+    def hit(self, key, window, now):
+        bucket = int(now // window)
+        current, previous = self.increment(key, bucket, window)
+        elapsed = (now % window) / window
+        estimate = previous * (1 - elapsed) + current
+        return estimate, (bucket + 1) * window - now
+
+    def increment(self, key, bucket, window):
+        raise NotImplementedError
+
+
+class CacheBackend(SlidingCounterBackend):
+    def increment(self, key, bucket, window):
+        cache = get_cache()
+        current_key = f'ratelimit:{key}:{bucket}'
+        # Keep each bucket alive for two windows so it can serve as "previous"
+        if not cache.add(current_key, 1, timeout=int(window * 2) + 1):
+            try:
+                cache.incr(current_key)
+            except ValueError:
+                cache.set(current_key, 1, timeout=int(window * 2) + 1)
+        counts = cache.get_many([current_key, f'ratelimit:{key}:{bucket - 1}'])
+        return counts.get(current_key, 1), counts.get(f'ratelimit:{key}:{bucket - 1}', 0)
+
+
+class DatabaseBackend(SlidingCounterBackend):
+    # Roughly one hit in this many also deletes expired counters
+    CLEANUP_EVERY = 200
+
+    def increment(self, key, bucket, window):
+        from .models import RateLimitCounter
+
+        counters = RateLimitCounter.objects.filter(key=key)
+        if not counters.filter(bucket=bucket).update(count=F('count') + 1):
+            try:
+                with transaction.atomic():
+                    RateLimitCounter.objects.create(key=key, bucket=bucket, count=1)
+            except IntegrityError:
+                counters.filter(bucket=bucket).update(count=F('count') + 1)
+        if random.randrange(self.CLEANUP_EVERY) == 0:
+            RateLimitCounter.objects.filter(bucket__lt=bucket - 1).delete()
+        counts = dict(counters.filter(bucket__in=[bucket, bucket - 1]).values_list('bucket', 'count'))
+        return counts.get(bucket, 1), counts.get(bucket - 1, 0)
+
+
+_memory_backend = MemoryBackend()
+
+BACKENDS = {
+    'memory': lambda: _memory_backend,
+    'cache': CacheBackend,
+    'db': DatabaseBackend,
+}
+
+
+def get_backend(name=None):
+    return BACKENDS[name or settings.CONTACT_RATELIMIT_BACKEND]()
+
+
+class SlidingWindowLimiter:
+    def __init__(self, scope, rate, backend=None):
+        self.scope = scope
+        self.limit, self.window = parse_rate(rate)
+        self.backend = backend or get_backend()
+
+    def hit(self, value):
+        """Count a hit for ``value``; return seconds to wait, or 0 if allowed"""
+        count, reset_in = self.backend.hit(f'{self.scope}:{value}', self.window, time.time())
+        if count > self.limit:
+            return max(reset_in, 1)
+        return 0
+
+
+def client_ip(request):
+    if settings.RATELIMIT_TRUST_X_FORWARDED_FOR:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check_contact_rate(request, email):
+    """Return seconds the client must wait, or 0 if the submission may proceed"""
+    backend = get_backend()
+    retry_after = SlidingWindowLimiter('contact-ip', settings.CONTACT_RATELIMIT_IP, backend).hit(client_ip(request))
+    if not retry_after and email:
+        retry_after = SlidingWindowLimiter(
+            'contact-email', settings.CONTACT_RATELIMIT_EMAIL, backend
+        ).hit(email.strip().lower())
+    return retry_after
+
+
+def form_timestamp():
+    """Signed render time embedded in the contact form"""
+    return signing.TimestampSigner(salt=FORM_TIMESTAMP_SALT).sign(str(int(time.time())))
+
+
+def looks_like_bot(request):
+    """Honeypot and fill-time checks; pure CPU, no I/O"""
+    if request.POST.get(settings.CONTACT_HONEYPOT_FIELD):
+        return True
+    try:
+        rendered_at = int(
+            signing.TimestampSigner(salt=FORM_TIMESTAMP_SALT).unsign(
+                request.POST.get('form_ts', ''), max_age=settings.CONTACT_FORM_MAX_AGE
+            )
+        )
+    except (signing.BadSignature, ValueError):
+        return True
+    return time.time() - rendered_at < settings.CONTACT_MIN_FILL_SECONDS
@@ -0,0 +1,163 @@
+"""
+Precomputed "related projects" graph.
+
+Similarity combines shared technologies (Jaccard over the tech links),
+a same-category bonus and how close the projects are in time. Each
+project stores edges to its best RELATED_LIMIT matches, so
+project_detail can read its list with one indexed query.
+
+The score is symmetric, so when one project changes only the projects
+it could enter or leave the lists of need rescoring: those that list it
+now, and candidates it would now outscore. rebuild_related() does just
+that; rebuild_all() recomputes everything.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from .models import Project, ProjectTechnology, RelatedProject
+
+RELATED_LIMIT = 6
+
+# Same-category projects sharing no technology are only considered among
+# the most recent ones, so a save never scans a whole large category
+CATEGORY_CANDIDATES = 50
+
+TECH_WEIGHT = 3.0
+CATEGORY_WEIGHT = 1.0
+RECENCY_WEIGHT = 0.5
+RECENCY_SCALE_DAYS = 365
+
+
+def similarity(shared, tech_count, other_tech_count, same_category, days_apart):
+    union = tech_count + other_tech_count - shared
+    score = TECH_WEIGHT * (shared / union if union else 0.0)
+    if same_category:
+        score += CATEGORY_WEIGHT
+    score += RECENCY_WEIGHT / (1 + days_apart / RECENCY_SCALE_DAYS)
+    return score
+
+
+def score_candidates(project, limit=RELATED_LIMIT):
+    """Return [(other_project_id, score)] for the best ``limit`` matches of ``project`` (all with None)"""
+    tech_ids = list(project.tech_links.values_list('technology_id', flat=True))
+    shared = dict(
+        ProjectTechnology.objects
+        .filter(technology_id__in=tech_ids)
+        .exclude(project_id=project.pk)
+        .values_list('project_id')
+        .annotate(shared=Count('id'))
+    )
+    category_ids = list(
+        Project.objects
+        .filter(visible=True, category=project.category)
+        .exclude(pk=project.pk)
+        .order_by('-created_at')
+        .values_list('id', flat=True)[:CATEGORY_CANDIDATES]
+    )
+
+    candidates = (
+        Project.objects
+        .filter(Q(id__in=list(shared)) | Q(id__in=category_ids), visible=True)
+        .exclude(pk=project.pk)
+        .annotate(tech_count=Count('tech_links'))
+        .values_list('id', 'category', 'created_at', 'tech_count')
+    )
+    scores = []
+    for other_id, category, created_at, tech_count in candidates:
+        days_apart = abs(project.created_at - created_at).days
+        scores.append((
+            other_id,
+            similarity(
+                shared.get(other_id, 0), len(tech_ids), tech_count,
+                category == project.category, days_apart,
+            ),
+        ))
+    # Ties broken by id, so incremental and full rebuilds agree
+    scores.sort(key=lambda item: (-item[1], item[0]))
+    return scores[:limit]
+
+
+def _slices(ids, size=500):
+    # Keeps IN lists under SQLite's bound-parameter limit
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _replace_edges(project_id, scores):
+    RelatedProject.objects.filter(project_id=project_id).delete()
+    RelatedProject.objects.bulk_create(
+        [RelatedProject(project_id=project_id, related_id=other_id, score=score) for other_id, score in scores],
+        ignore_conflicts=True,
+    )
+
+
+def affected_by(project, scores=()):
+    """
+    Ids of the projects whose lists could change with ``project``: those
+    listing it now, plus the ``scores`` candidates it would enter (their
+    list is short, or it beats their weakest edge).
+    """
+    ids = set(RelatedProject.objects.filter(related_id=project.pk).values_list('project_id', flat=True))
+    scores = dict(scores)
+    lists = {}
+    for chunk in _slices(scores):
+        lists.update(
+            (project_id, (count, lowest))
+            for project_id, count, lowest in RelatedProject.objects
+            .filter(project_id__in=chunk)
+            .values_list('project_id')
+            .annotate(count=Count('id'), lowest=Min('score'))
+        )
+    for other_id, score in scores.items():
+        count, lowest = lists.get(other_id, (0, None))
+        if count < RELATED_LIMIT or score >= lowest:
+            ids.add(other_id)
+    ids.discard(project.pk)
+    return ids
+
+
+def rebuild_related(project):
+    """Recompute ``project``'s edges and those of every project it could enter or leave"""
+    scores = score_candidates(project, limit=None) if project.visible else []
+    with transaction.atomic():
+        affected = affected_by(project, scores)
+        _replace_edges(project.pk, scores[:RELATED_LIMIT])
+        rescore(affected)
+
+
+def rescore(project_ids):
+    """Recompute the lists of the given projects, e.g. those that listed a deleted one"""
+    with transaction.atomic():
+        for chunk in _slices(project_ids):
+            RelatedProject.objects.filter(project_id__in=chunk, project__visible=False).delete()
+            for other in Project.objects.filter(id__in=chunk, visible=True):
+                _replace_edges(other.pk, score_candidates(other))
+
+
+def rebuild_all():
+    """Recompute the whole graph from scratch, returning the number of projects"""
+    count = 0
+    with transaction.atomic():
+        RelatedProject.objects.all().delete()
+        for project in Project.objects.filter(visible=True).iterator(chunk_size=500):
+            scores = score_candidates(project)
+            RelatedProject.objects.bulk_create(
+                [
+                    RelatedProject(project_id=project.pk, related_id=other_id, score=score)
+                    for other_id, score in scores
+                ],
+                ignore_conflicts=True,
+            )
+            count += 1
+    return count
+
+
+def related_projects(project, limit=3):
+    """Visible related projects, best first, in a single indexed query"""
+    return (
+        Project.objects
+        .filter(related_from__project=project, visible=True)
+        .order_by('-related_from__score')[:limit]
+    )
@@ -0,0 +1,191 @@
+"""
+Full-text project search.
+
+PostgreSQL uses the stored ``Project.search_vector`` column (GIN indexed,
+refreshed on save). SQLite uses the ``website_project_fts`` FTS5 table
+that migration 0005 keeps in sync with triggers. Both return projects
+ranked best first with highlighted title and description snippets.
+Other databases fall back to unindexed ``icontains`` matching.
+"""
+
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+SEARCH_LIMIT = 50
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'website_project_fts'
+
+# Highlight markers that cannot appear in user content; swapped for <mark>
+# only after the surrounding text has been HTML-escaped.
+START_SEL = '\x02'
+STOP_SEL = '\x03'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS website_project_fts_insert AFTER INSERT ON website_project BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, technologies, description)
+        VALUES (new.id, new.title, new.technologies, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS website_project_fts_delete AFTER DELETE ON website_project BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, technologies, description)
+        VALUES ('delete', old.id, old.title, old.technologies, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS website_project_fts_update
+    AFTER UPDATE OF title, technologies, description ON website_project BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, technologies, description)
+        VALUES ('delete', old.id, old.title, old.technologies, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, technologies, description)
+        VALUES (new.id, new.title, new.technologies, new.description);
+    END
+    """,
+]
+
+
+def ensure_sqlite_triggers(using='default', **kwargs):
+    """
+    Recreate the FTS5 sync triggers if a migration dropped them.
+
+    SQLite alters tables by rebuilding them, which silently drops their
+    triggers, so this runs after every migrate (see apps.py).
+    """
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != 'sqlite' or FTS_TABLE not in conn.introspection.table_names():
+        return
+    with conn.cursor() as cursor:
+        for statement in SQLITE_TRIGGERS:
+            cursor.execute(statement)
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('technologies', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vector(queryset):
+    """Refresh the stored search vector for the given projects (PostgreSQL only)"""
+    if connection.vendor == 'postgresql':
+        queryset.update(search_vector=search_vector())
+
+
+def highlight_html(text):
+    if text is None:
+        return ''
+    return mark_safe(
+        escape(text).replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+    )
+
+
+def _fts_query(query):
+    """Quote every word so user input can never be parsed as FTS5 syntax"""
+    tokens = TOKEN_RE.findall(query)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _search_postgresql(queryset, query):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+    from django.db.models import F
+
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(
+            search_rank=SearchRank(F('search_vector'), search_query),
+            title_match=SearchHeadline(
+                'title', search_query, config=SEARCH_CONFIG,
+                start_sel=START_SEL, stop_sel=STOP_SEL, highlight_all=True,
+            ),
+            description_match=SearchHeadline(
+                'description', search_query, config=SEARCH_CONFIG,
+                start_sel=START_SEL, stop_sel=STOP_SEL, max_words=30, min_words=15,
+            ),
+        )
+        .order_by('-search_rank', 'order')
+    )
+
+
+def _search_sqlite(queryset, query):
+    match = _fts_query(query)
+    if not match:
+        return queryset.none()
+    # bm25() is lower-is-better; the weights rank title over technologies
+    # over description, mirroring the A/B/C weights used on PostgreSQL.
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = website_project.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={
+            'search_rank': f'-bm25({FTS_TABLE}, 10.0, 4.0, 1.0)',
+            'title_match': f"highlight({FTS_TABLE}, 0, %s, %s)",
+            'description_match': f"snippet({FTS_TABLE}, 2, %s, %s, '...', 30)",
+        },
+        select_params=[START_SEL, STOP_SEL, START_SEL, STOP_SEL],
+    ).order_by('-search_rank', 'order')
+
+
+def _search_fallback(queryset, tokens):
+    """Every word in the title, technologies or description; title matches first"""
+    if not tokens:
+        return queryset.none()
+    for token in tokens:
+        queryset = queryset.filter(
+            Q(title__icontains=token) | Q(technologies__icontains=token) | Q(description__icontains=token)
+        )
+    in_title = reduce(or_, (Q(title__icontains=token) for token in tokens))
+    return queryset.annotate(
+        search_rank=Case(When(in_title, then=Value(2.0)), default=Value(1.0), output_field=FloatField()),
+    ).order_by('-search_rank', 'order')
+
+
+def _mark(text, tokens):
+    """Wrap ``tokens`` in the highlight markers, as the database snippets do"""
+    pattern = re.compile('|'.join(re.escape(token) for token in tokens), re.IGNORECASE)
+    return pattern.sub(lambda match: f'{START_SEL}{match.group()}{STOP_SEL}', text)
+
+
+def search_projects(queryset, query, limit=SEARCH_LIMIT):
+    """
+    Return up to ``limit`` projects from ``queryset`` matching ``query``.
+
+    Each project carries ``search_rank`` (higher is better) plus
+    ``title_highlight`` and ``description_highlight``, HTML-safe strings
+    with the matched words wrapped in <mark>.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    if connection.vendor == 'postgresql':
+        results = list(_search_postgresql(queryset, query)[:limit])
+    elif connection.vendor == 'sqlite':
+        results = list(_search_sqlite(queryset, query)[:limit])
+    else:
+        tokens = TOKEN_RE.findall(query)
+        results = list(_search_fallback(queryset, tokens)[:limit])
+        for project in results:
+            project.title_match = _mark(project.title, tokens)
+            project.description_match = _mark(Truncator(project.description).words(30), tokens)
+
+    for project in results:
+        project.title_highlight = highlight_html(project.title_match)
+        project.description_highlight = highlight_html(project.description_match)
+    return results
@@ -0,0 +1,108 @@
+"""
+Bulk, idempotent writes for seeding the catalog.
+
+Projects are written by slug with one INSERT ... ON CONFLICT per batch,
+so re-running a seed never duplicates them: generated rows are updated in
+place, hand-written ones that already exist are left as edited in the admin.
+bulk_create skips Project.save() and the model signals, so everything
+they would do is done here per batch instead: slug and short description,
+the technology links and the PostgreSQL search vector (SQLite's FTS table
+follows through its triggers). relate_projects() scores a few projects
+incrementally; finish_seeding() covers the per-catalog work: rebuilding
+the whole related-projects graph and the page cache generation.
+"""
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from .cache import bump_generation
+from .models import Contact, Project, ProjectImage, ProjectTechnology, Technology, parse_technologies
+from .related import rebuild_all, rebuild_related
+from .search import update_search_vector
+
+# Everything a seed row may set; updated in place when overwriting an existing slug
+PROJECT_FIELDS = [
+    'title', 'description', 'short_description', 'category', 'featured', 'github_url',
+    'live_url', 'technologies', 'status', 'order',
+]
+
+
+def short_description(description):
+    """Same rule as Project.save()"""
+    return description[:250] + '...' if len(description) > 250 else description
+
+
+def upsert_technologies(rows):
+    """Create the given technologies; existing ones (possibly edited in the admin) are left alone"""
+    Technology.objects.bulk_create([Technology(**row) for row in rows], ignore_conflicts=True)
+
+
+def upsert_projects(rows, overwrite=True):
+    """
+    Insert one batch of project dicts by slug and link their technologies.
+    Existing projects are updated when ``overwrite`` is set and skipped
+    otherwise. Returns ({slug: id} for the batch, set of slugs that did
+    not exist before).
+    """
+    projects = []
+    for row in rows:
+        row = {
+            'slug': slugify(row['title']),
+            'short_description': short_description(row['description']),
+            **row,
+        }
+        projects.append(Project(**row))
+    slugs = [project.slug for project in projects]
+    existing = set(Project.objects.filter(slug__in=slugs).values_list('slug', flat=True))
+
+    if overwrite:
+        Project.objects.bulk_create(
+            projects,
+            update_conflicts=True,
+            unique_fields=['slug'],
+            update_fields=PROJECT_FIELDS,
+        )
+    else:
+        Project.objects.bulk_create(projects, ignore_conflicts=True)
+    ids = dict(Project.objects.filter(slug__in=slugs).values_list('slug', 'id'))
+    written = [project for project in projects if overwrite or project.slug not in existing]
+    link_technologies({ids[project.slug]: project.technologies for project in written})
+    update_search_vector(Project.objects.filter(id__in=[ids[project.slug] for project in written]))
+    return ids, set(slugs) - existing
+
+
+def link_technologies(technologies_by_id):
+    """Bulk version of Project.sync_technologies() for {project id: technologies string}"""
+    names_by_id = {pk: parse_technologies(value) for pk, value in technologies_by_id.items()}
+    names = {name for project_names in names_by_id.values() for name in project_names}
+    Technology.objects.bulk_create([Technology(name=name) for name in names], ignore_conflicts=True)
+    technology_ids = dict(Technology.objects.filter(name__in=names).values_list('name', 'id'))
+
+    ProjectTechnology.objects.filter(project_id__in=names_by_id).delete()
+    ProjectTechnology.objects.bulk_create([
+        ProjectTechnology(project_id=pk, technology_id=technology_ids[name], order=position)
+        for pk, project_names in names_by_id.items()
+        for position, name in enumerate(project_names)
+    ])
+
+
+def add_gallery(rows):
+    """Bulk-create ProjectImage rows (no derivatives are queued)"""
+    ProjectImage.objects.bulk_create([ProjectImage(**row) for row in rows])
+
+
+def add_contacts(rows):
+    Contact.objects.bulk_create([Contact(**row) for row in rows])
+
+
+def relate_projects(ids):
+    """Incrementally score the given projects against the catalog, as the post_save signal does"""
+    for project in Project.objects.filter(id__in=ids):
+        rebuild_related(project)
+
+
+def finish_seeding(related=True):
+    """Rebuild the related-projects graph and invalidate cached pages once the seed commits"""
+    if related:
+        rebuild_all()
+    transaction.on_commit(bump_generation)
@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .models import Project, ProjectImage, RelatedProject, Technology
+from .detail import forget_project_detail
+from .imagejobs import enqueue_image_job
+from .images import needs_processing, upload_hash
+from .related import rebuild_related, rescore
+from .search import update_search_vector
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ProjectImage)
+@receiver(post_delete, sender=ProjectImage)
+@receiver(post_save, sender=Technology)
+@receiver(post_delete, sender=Technology)
+def invalidate_page_cache(sender, **kwargs):
+    """Content changed, so every cached page is now stale"""
+    # Wait for the commit so no request can cache pre-save content
+    # (or the technology links synced after post_save) under the new generation
+    transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=Project)
+def refresh_search_vector(sender, instance, **kwargs):
+    # SQLite keeps its FTS5 table current with triggers; PostgreSQL stores
+    # the vector on the row so the GIN index can be used
+    update_search_vector(Project.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Project)
+def refresh_related_projects(sender, instance, **kwargs):
+    # After commit, so the technology links synced in Project.save() are scored
+    transaction.on_commit(lambda: rebuild_related(instance))
+
+
+@receiver(pre_delete, sender=Project)
+def remember_listing_projects(sender, instance, **kwargs):
+    # Their edges to it cascade away with it, so their lists must be refilled
+    instance._listed_by = list(
+        RelatedProject.objects.filter(related=instance).values_list('project_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Project)
+def refill_related_projects(sender, instance, **kwargs):
+    listed_by = getattr(instance, '_listed_by', [])
+    if listed_by:
+        transaction.on_commit(lambda: rescore(listed_by))
+
+
+@receiver(pre_save, sender=Project)
+def remember_previous_slug(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_slug = (
+            Project.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def forget_cached_detail(sender, instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)} - {None}
+    transaction.on_commit(lambda: forget_project_detail(*slugs))
+
+
+@receiver(pre_save, sender=Project)
+@receiver(pre_save, sender=ProjectImage)
+def hash_uploaded_image(sender, instance, **kwargs):
+    # The upload is still in memory (or a temp file) here, so hashing it is
+    # cheap; after the save the worker would have to download it again
+    instance._image_hash = upload_hash(instance.image)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=ProjectImage)
+def queue_image_derivatives(sender, instance, **kwargs):
+    # Same transaction as the save; process_image_jobs does the work
+    if needs_processing(instance.image, instance.image_variants or {}):
+        enqueue_image_job(instance, 'image', getattr(instance, '_image_hash', ''))
@@ -0,0 +1,149 @@
+"""
+Synthetic, deterministic catalog data for benchmarks and load tests.
+
+The rows have the same shape as populate_projects' hand-written data:
+titles and multi-sentence descriptions, a category, comma-separated
+technologies drawn from the same list, GitHub/live links, status and
+order. The same seed always gives the same rows. Gallery images and
+contact submissions are derived from the same numbering.
+
+seed_catalog() writes them with the bulk helpers in seed.py in batches
+of ``batch_size``, so memory stays flat however many rows are generated,
+and projects that already exist (same seed and numbering) are updated
+rather than duplicated.
+"""
+
+import random
+from itertools import islice
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from .models import Contact, Project
+from .seed import add_contacts, add_gallery, finish_seeding, upsert_projects, upsert_technologies
+
+TECHNOLOGIES = [
+    {'name': 'Python', 'category': 'language', 'icon': 'fab fa-python', 'color': '#3776ab'},
+    {'name': 'Django', 'category': 'framework', 'icon': 'fab fa-python', 'color': '#092e20'},
+    {'name': 'JavaScript', 'category': 'language', 'icon': 'fab fa-js-square', 'color': '#f7df1e'},
+    {'name': 'React', 'category': 'library', 'icon': 'fab fa-react', 'color': '#61dafb'},
+    {'name': 'Next.js', 'category': 'framework', 'icon': 'fab fa-js', 'color': '#000000'},
+    {'name': 'TypeScript', 'category': 'language', 'icon': 'fab fa-js', 'color': '#3178c6'},
+    {'name': 'PostgreSQL', 'category': 'database', 'icon': 'fas fa-database', 'color': '#336791'},
+    {'name': 'HTML5', 'category': 'language', 'icon': 'fab fa-html5', 'color': '#e34f26'},
+    {'name': 'CSS3', 'category': 'language', 'icon': 'fab fa-css3-alt', 'color': '#1572b6'},
+]
+
+# Technologies that only appear in project text, as in the real data
+EXTRA_TECHNOLOGIES = ['SQLite', 'Tkinter', 'Azure', 'Flask', 'Pandas', 'Redis', 'Docker', 'Celery']
+
+CATEGORIES = [choice for choice, _ in Project.CATEGORY_CHOICES]
+STATUSES = ['active', 'completed', 'archived', 'on_hold']
+# Synthetic contacts are recognised by their address, so a rerun only tops them up
+CONTACT_DOMAIN = 'synthetic.example.com'
+SUBJECTS = [choice for choice, _ in Contact._meta.get_field('subject').choices]
+
+_ADJECTIVES = ['Automated', 'Interactive', 'Lightweight', 'Offline', 'Realtime', 'Scalable', 'Personal', 'Open']
+_NOUNS = ['Dashboard', 'Tracker', 'Quiz Game', 'Email System', 'Blog', 'Scheduler', 'Glossary', 'Inventory Tool']
+_AUDIENCES = ['Volunteers', 'Students', 'Small Businesses', 'NGOs', 'Developers', 'Readers']
+_FIRST_NAMES = ['Ada', 'Tunde', 'Grace', 'Chidi', 'Linus', 'Amaka', 'Ngozi', 'Sam', 'Yusuf', 'Maria']
+_LAST_NAMES = ['Okafor', 'Adeyemi', 'Hopper', 'Bello', 'Smith', 'Eze', 'Garcia', 'Lovelace']
+_SENTENCES = [
+    'Built to replace a manual process with something repeatable and logged.',
+    'Supports personalized templates, scheduled runs and batching.',
+    'Implements spaced repetition concepts to reinforce learning over time.',
+    'Designed for performance and easy content workflows.',
+    'Focuses on clean design, responsiveness and easy updates.',
+    'Deployed with PostgreSQL and optionally hosted on Azure.',
+    'Features an interactive map, quizzes, scoring and progressive difficulty.',
+    'Accessible as a light web app with offline-ready behavior where possible.',
+]
+
+
+def project_rows(count, start=0, seed=0):
+    """Yield ``count`` project field dicts, numbered from ``start``"""
+    names = [tech['name'] for tech in TECHNOLOGIES] + EXTRA_TECHNOLOGIES
+    for number in range(start, start + count):
+        rng = random.Random(f'{seed}:{number}')
+        title = f'{rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)} for {rng.choice(_AUDIENCES)} #{number}'
+        yield {
+            'title': title,
+            'description': ' '.join(rng.sample(_SENTENCES, rng.randint(2, 4))),
+            'category': rng.choice(CATEGORIES),
+            'featured': rng.random() < 0.05,
+            'github_url': f'https://github.com/Dimeji-G/project-{number}' if rng.random() < 0.7 else '',
+            'live_url': f'https://project-{number}.dimroid.com' if rng.random() < 0.3 else '',
+            'technologies': ', '.join(rng.sample(names, rng.randint(2, 6))),
+            'status': rng.choice(STATUSES),
+            'order': rng.randint(0, 100),
+        }
+
+
+def gallery_rows(project_id, number, seed=0):
+    """Zero to three gallery image dicts for synthetic project ``number``"""
+    rng = random.Random(f'{seed}:{number}:gallery')
+    for position in range(rng.randint(0, 3)):
+        yield {
+            'project_id': project_id,
+            'image': f'projects/gallery/synthetic-{number}-{position}.png',
+            'caption': rng.choice(_SENTENCES)[:200],
+            'order': position,
+        }
+
+
+def contact_rows(count, start=0, seed=0):
+    """Yield ``count`` contact submission dicts, numbered from ``start``"""
+    for number in range(start, start + count):
+        rng = random.Random(f'{seed}:{number}:contact')
+        name = f'{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}'
+        yield {
+            'name': name,
+            'email': f"{name.lower().replace(' ', '.')}.{number}@{CONTACT_DOMAIN}",
+            'subject': rng.choice(SUBJECTS),
+            'message': ' '.join(rng.sample(_SENTENCES, rng.randint(1, 3))),
+            'newsletter': rng.random() < 0.3,
+            'replied': rng.random() < 0.5,
+        }
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def seed_catalog(count, seed=0, contacts=0, batch_size=2000, related=True, progress=None):
+    """
+    Create the technologies, ``count`` synthetic projects with their
+    gallery rows and up to ``contacts`` synthetic contact submissions, in
+    one transaction. Gallery rows are only added to newly created projects
+    and contacts only past the ones already seeded, so seeding twice leaves
+    the data as it was. ``progress(label, done)`` is called after each
+    batch. Returns (projects created, gallery rows, contacts created).
+    """
+    created = images = 0
+    with transaction.atomic():
+        upsert_technologies(TECHNOLOGIES)
+        done = 0
+        for batch in _batches(project_rows(count, seed=seed), batch_size):
+            ids, new = upsert_projects(batch)
+            gallery = []
+            for number, row in enumerate(batch, start=done):
+                slug = slugify(row['title'])
+                if slug in new:
+                    gallery.extend(gallery_rows(ids[slug], number, seed=seed))
+            add_gallery(gallery)
+            created += len(new)
+            images += len(gallery)
+            done += len(batch)
+            if progress:
+                progress('projects', done)
+        done = Contact.objects.filter(email__endswith=f'@{CONTACT_DOMAIN}').count()
+        new_contacts = max(contacts - done, 0)
+        for batch in _batches(contact_rows(new_contacts, start=done, seed=seed), batch_size):
+            add_contacts(batch)
+            done += len(batch)
+            if progress:
+                progress('contacts', done)
+        finish_seeding(related=related)
+    return created, images, new_contacts
@@ -0,0 +1,63 @@
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from website.critical import load_critical_file, read_stylesheet, stylesheet_hash
+
+register = template.Library()
+
+# Set by buildcritical while it renders pages, to learn which template
+# uses which stylesheets
+collecting = ContextVar('critical_css_collecting', default=None)
+
+
+@lru_cache(maxsize=None)
+def _critical_file():
+    return load_critical_file()
+
+
+@lru_cache(maxsize=None)
+def _current_hash(name):
+    content = read_stylesheet(name)
+    return stylesheet_hash(content) if content is not None else None
+
+
+@lru_cache(maxsize=256)
+def _snippet(template_name, name, asset_hash):
+    entry = _critical_file().get(template_name, {}).get(name)
+    href = static(name)
+    if not entry or entry['hash'] != asset_hash:
+        return format_html('<link rel="stylesheet" href="{}">', href)
+    return format_html(
+        '<style>{}</style>\n'
+        '    <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '    <noscript><link rel="stylesheet" href="{}"></noscript>',
+        # Only a closing tag could break out of the <style> element
+        mark_safe(entry['css'].replace('</', '<\\/')),
+        href,
+        href,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def stylesheet(context, name):
+    """
+    Link a stylesheet, inlining this page's critical CSS from it and loading
+    the rest asynchronously when buildcritical has produced a current entry.
+    """
+    template_name = context.template.name if context.template else ''
+    collected = collecting.get()
+    if collected is not None:
+        collected.append((template_name, name))
+        return format_html('<link rel="stylesheet" href="{}">', static(name))
+    return _snippet(template_name, name, _current_hash(name))
+
+
+def clear_caches():
+    _critical_file.cache_clear()
+    _current_hash.cache_clear()
+    _snippet.cache_clear()
@@ -1,3 +1,1521 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import importlib
+import inspect
+import io
+import json
+import os
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage, Storage
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.http import Http404
+from django.template import Context, Template, TemplateDoesNotExist, engines
+from django.test.utils import CaptureQueriesContext
+from django.test import AsyncRequestFactory, LiveServerTestCase, RequestFactory, TestCase, override_settings
+from django.urls import clear_url_caches, resolve, reverse, reverse_lazy
+from django.utils import timezone
+
+from PIL import Image
+
+from dimeji import urls as project_urls
+from dimeji.custom_storages import AzureMediaStorage, AzureStaticStorage, CachedURLMixin, bulk_urls, clear_url_cache
+
+from . import detail, urls, views
+from .management.commands.loadtest import Command as LoadTestCommand
+from .assets import minify_css, minify_js
+from .benchmark import LatencyProxy
+from .middleware import view_stats
+from .cache import get_cache, get_generation
+from .catalog import get_catalog
+from .critical import extract_critical, read_stylesheet, stylesheet_hash
+from .github import refresh_stats
+from .imagejobs import process_jobs
+from .images import DERIVATIVE_WIDTHS, FORMATS, render_derivatives
+from .models import (
+    Contact, ImageJob, OutboxEmail, Project, ProjectImage, ProjectTechnology, RelatedProject, RepoStats,
+    Technology, parse_github_repo,
+)
+from .outbox import deliver_pending
+from .performance import TimedTemplate
+from .ratelimit import CacheBackend, DatabaseBackend, MemoryBackend, SlidingWindowLimiter, form_timestamp
+from .related import RELATED_LIMIT, rebuild_all
+from .search import FTS_TABLE, search_projects
+from .synthetic import project_rows, seed_catalog
+from .templatetags import critical
+
+# The manifest storage used in production needs collectstatic to have run
+PLAIN_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Per-test-run cache, so nothing leaks in from the shared file cache
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'},
+}
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.project = Project.objects.create(
+            title='Alpha', description='Description', github_url='', technologies='Python',
+        )
+
+    def edit(self, **changes):
+        for field, value in changes.items():
+            setattr(self.project, field, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+
+    def test_edit_is_visible_on_the_next_request(self):
+        url = reverse('website:projects')
+        self.assertContains(self.client.get(url), 'Alpha')
+        self.edit(title='Beta')
+        response = self.client.get(url)
+        self.assertContains(response, 'Beta')
+        self.assertNotContains(response, 'Alpha')
+
+    def test_generation_moves_only_after_commit(self):
+        before = get_generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.project.save()
+            self.assertEqual(get_generation(), before)
+        self.assertEqual(get_generation(), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_generation(), before)
+
+        before = get_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+        self.assertNotEqual(get_generation(), before)
+
+    def test_admin_bulk_actions_bump_generation(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        for action in ('make_featured', 'remove_featured', 'make_hidden', 'make_visible'):
+            before = get_generation()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('admin:website_project_changelist'), {
+                    'action': action, '_selected_action': [self.project.pk],
+                })
+            self.assertNotEqual(get_generation(), before, action)
+        self.project.refresh_from_db()
+        self.assertTrue(self.project.visible)
+
+    def test_conditional_get(self):
+        url = reverse('website:projects')
+        first = self.client.get(url)
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+
+        self.edit(title='Gamma')
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_only_listed_parameters_vary(self):
+        url = reverse('website:projects')
+        self.client.get(url, {'utm_source': 'a'})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, {'utm_source': 'b'}).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'category': 'web'})
+        self.assertTrue(queries.captured_queries)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class ProjectsApiPaginationTests(TestCase):
+    url = reverse_lazy('website:projects_api')
+
+    def setUp(self):
+        get_cache().clear()
+        Project.objects.bulk_create([
+            Project(
+                title=f'Project {i}', slug=f'project-{i}', description='Description', github_url='',
+                technologies='Python', order=i % 2, featured=i % 3 == 0, visible=i != 7,
+            )
+            for i in range(23)
+        ])
+        # Ties on every ordering column but the id
+        Project.objects.update(created_at=timezone.now())
+
+    def walk(self, **params):
+        slugs, url, pages = [], self.url, 0
+        while url:
+            response = self.client.get(url, params if pages == 0 else None)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            slugs += [project['slug'] for project in data['projects']]
+            url, pages = data['next'], pages + 1
+        return slugs, pages
+
+    def test_walks_every_project_once_in_order(self):
+        slugs, pages = self.walk(limit=5, fields='slug')
+        expected = list(
+            Project.objects.filter(visible=True)
+            .order_by('order', '-featured', '-created_at', '-id')
+            .values_list('slug', flat=True)
+        )
+        self.assertEqual(slugs, expected)
+        self.assertEqual(len(set(slugs)), 22)
+        self.assertEqual(pages, 5)
+
+    def test_bad_requests(self):
+        for params, error in (
+            ({'cursor': 'not-a-cursor'}, 'Invalid cursor'),
+            *(
+                ({'cursor': base64.urlsafe_b64encode(value).decode()}, 'Invalid cursor')
+                for value in (
+                    b'[1, 2]',
+                    b'[1, true, "2024-01-01T00:00:00", 1, 5]',
+                    b'"abcd"',
+                    b'{"order": 1}',
+                    b'["x", true, "2024-01-01", 1]',
+                    b'[1, "abc", "2024-01-01T00:00:00", 1]',
+                    b'[1, 1, "2024-01-01T00:00:00", 1]',
+                    b'[1, true, 20240101, 1]',
+                    b'[1, true, "yesterday", 1]',
+                    b'[1, true, "2024-01-01T00:00:00", "1"]',
+                    b'[1.5, true, "2024-01-01T00:00:00", 1]',
+                    b'[true, true, "2024-01-01T00:00:00", 1]',
+                    b'[1, true, "2024-01-01T00:00:00", null]',
+                )
+            ),
+            ({'fields': 'title,password'}, 'Unknown fields: password'),
+            ({'limit': 'many'}, 'limit must be an integer'),
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertEqual(response.json(), {'error': error})
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(len(self.client.get(self.url, {'limit': 0}).json()['projects']), 1)
+        with mock.patch.object(views, 'API_MAX_LIMIT', 10):
+            self.assertEqual(len(self.client.get(self.url, {'limit': 1000}).json()['projects']), 10)
+
+    def test_cached_page_answers_304(self):
+        first = self.client.get(self.url, {'limit': 5})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'limit': 5}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class CatalogTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.project = Project.objects.create(
+            title='Alpha', description='Description', github_url='', technologies='Python, Django',
+        )
+
+    def fetch(self, digest=None, **headers):
+        digest = digest or get_catalog()['digest']
+        return self.client.get(reverse('website:projects_catalog', args=[digest]), **headers)
+
+    def test_gzip_or_raw_by_accept_encoding(self):
+        raw = self.fetch()
+        self.assertNotIn('Content-Encoding', raw)
+        self.assertEqual(raw.json()['projects'][0]['title'], 'Alpha')
+        self.assertIn('Accept-Encoding', raw['Vary'])
+
+        compressed = self.fetch(HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), raw.content)
+
+    def test_only_the_current_digest_is_immutable(self):
+        current = self.fetch()
+        self.assertIn('immutable', current['Cache-Control'])
+        self.assertIn('max-age=31536000', current['Cache-Control'])
+        stale = self.fetch('0123456789abcdef')
+        self.assertIn('no-cache', stale['Cache-Control'])
+        self.assertNotIn('immutable', stale['Cache-Control'])
+
+    def test_digest_changes_after_an_edit(self):
+        before = get_catalog()['digest']
+        self.project.title = 'Beta'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        after = get_catalog()
+        self.assertNotEqual(after['digest'], before)
+        self.assertIn(b'"Beta"', after['raw'])
+
+    def test_entries_expire(self):
+        with mock.patch.object(get_cache(), 'set', wraps=get_cache().set) as cache_set:
+            get_catalog()
+        cache_set.assert_called_once()
+        self.assertEqual(cache_set.call_args.args[2], settings.PAGE_CACHE_TIMEOUT)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class TechnologyLinkTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def links(self, project):
+        return list(project.tech_links.order_by('order').values_list('technology__name', flat=True))
+
+    def test_backfill_migration(self):
+        migration = importlib.import_module('website.migrations.0003_populate_project_technologies')
+        state_apps = MigrationLoader(connection).project_state(('website', '0003_populate_project_technologies')).apps
+        Technology.objects.create(name='Django', icon='fab fa-python')
+        first = Project.objects.create(title='First', description='D', github_url='', technologies='Django, Python, Django')
+        second = Project.objects.create(title='Second', description='D', github_url='', technologies=' , Tkinter')
+        ProjectTechnology.objects.all().delete()
+        Technology.objects.exclude(name='Django').delete()
+
+        for _ in range(2):
+            migration.populate_project_technologies(state_apps, None)
+            self.assertEqual(self.links(first), ['Django', 'Python'])
+            self.assertEqual(self.links(second), ['Tkinter'])
+        self.assertEqual(Technology.objects.get(name='Django').icon, 'fab fa-python')
+        self.assertEqual(ProjectTechnology.objects.count(), 3)
+
+    def test_save_syncs_links(self):
+        project = Project.objects.create(title='P', description='D', github_url='', technologies='Python, Django')
+        self.assertEqual(self.links(project), ['Python', 'Django'])
+        project.technologies = 'React, Python'
+        project.save()
+        self.assertEqual(self.links(project), ['React', 'Python'])
+        self.assertEqual(project.get_technologies_list(), ['React', 'Python'])
+
+    def test_tech_filter_is_case_insensitive(self):
+        Project.objects.create(title='Uses Python', description='D', github_url='', technologies='Python')
+        Project.objects.create(title='Uses React', description='D', github_url='', technologies='React')
+        for value in ('python', 'PYTHON', 'Python'):
+            page = self.client.get(reverse('website:projects'), {'tech': value})
+            self.assertContains(page, 'Uses Python')
+            self.assertNotContains(page, 'Uses React')
+            api = self.client.get(reverse('website:projects_api'), {'tech': value, 'fields': 'title'})
+            self.assertEqual(api.json()['projects'], [{'title': 'Uses Python'}])
+
+    def test_catalog_tags_come_from_links(self):
+        Project.objects.create(title='P', description='D', github_url='', technologies='Python, Django')
+        # Renamed in the admin: the text field still says Django
+        technology = Technology.objects.get(name='Django')
+        technology.name = 'Django 5'
+        with self.captureOnCommitCallbacks(execute=True):
+            technology.save()
+        self.assertEqual(json.loads(get_catalog()['raw'])['projects'][0]['tags'], ['Python', 'Django 5'])
+        api = self.client.get(reverse('website:projects_api'), {'fields': 'tags'})
+        self.assertEqual(api.json()['projects'], [{'tags': ['Python', 'Django 5']}])
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class SearchTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.in_title = Project.objects.create(
+            title='Vocabulary Trainer', description='Flashcards for <b>students</b>.', github_url='',
+            technologies='Python',
+        )
+        self.in_description = Project.objects.create(
+            title='Study Tool', description='Builds vocabulary lists from reading.', github_url='',
+            technologies='Django',
+        )
+        Project.objects.create(title='Map Game', description='States quiz', github_url='', technologies='Tkinter')
+
+    def search(self, query):
+        return search_projects(Project.objects.all(), query)
+
+    def fts_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {FTS_TABLE} ORDER BY rowid')
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search('vocabulary'), [self.in_title, self.in_description])
+        self.assertEqual(self.search('vocab'), [self.in_title, self.in_description])
+
+    def test_highlights_are_marked_and_escaped(self):
+        title, description = self.search('vocabulary')
+        self.assertEqual(title.title_highlight, '<mark>Vocabulary</mark> Trainer')
+        self.assertIn('<mark>vocabulary</mark>', description.description_highlight)
+        flashcards = self.search('flashcards')[0]
+        self.assertIn('&lt;b&gt;students&lt;/b&gt;', flashcards.description_highlight)
+        self.assertEqual(self.search('"); DROP TABLE x; --'), [])
+
+    def test_triggers_follow_insert_update_delete(self):
+        self.assertEqual(self.fts_rows(), sorted(Project.objects.values_list('id', flat=True)))
+        self.in_description.title = 'Reading Helper'
+        self.in_description.description = 'Nothing in common'
+        self.in_description.save()
+        self.assertEqual(self.search('vocabulary'), [self.in_title])
+        self.assertEqual(self.search('reading'), [self.in_description])
+        self.in_title.delete()
+        self.assertEqual(self.search('vocabulary'), [])
+        self.assertEqual(self.fts_rows(), sorted(Project.objects.values_list('id', flat=True)))
+
+    def test_other_databases_fall_back_to_icontains(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            results = self.search('vocabulary')
+            self.assertEqual(results, [self.in_title, self.in_description])
+            self.assertEqual(results[0].title_highlight, '<mark>Vocabulary</mark> Trainer')
+            self.assertEqual(self.search('vocabulary reading'), [self.in_description])
+            page = self.client.get(reverse('website:projects'), {'q': 'vocabulary'})
+        self.assertContains(page, 'Vocabulary')
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class ProjectDetailCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        detail._local.clear()
+        self.project = Project.objects.create(title='Weather App', description='Forecasts', github_url='')
+
+    def test_warm_lookups_skip_the_database(self):
+        first = detail.get_project_detail('weather-app')
+        self.assertEqual(first['project'], self.project)
+        with self.assertNumQueries(0):
+            self.assertIs(detail.get_project_detail('weather-app'), first)
+
+    def test_shared_cache_serves_a_cold_process(self):
+        detail.get_project_detail('weather-app')
+        detail._local.clear()
+        with self.assertNumQueries(0):
+            shared = detail.get_project_detail('weather-app')
+        self.assertEqual(shared['project'], self.project)
+        self.assertIsNotNone(detail._local.get('weather-app'))
+
+    def test_slug_change_forgets_both_slugs(self):
+        detail.get_project_detail('weather-app')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.slug = 'forecasts'
+            self.project.save()
+        self.assertIsNone(detail._local.get('weather-app'))
+        self.assertIsNone(detail.get_project_detail('weather-app'))
+        self.assertEqual(detail.get_project_detail('forecasts')['project'], self.project)
+
+    def test_forget_project_detail_drops_local_copies(self):
+        detail.get_project_detail('weather-app')
+        detail.forget_project_detail('weather-app', 'never-cached')
+        self.assertIsNone(detail._local.get('weather-app'))
+
+    def test_missing_slug_is_cached_until_it_is_created(self):
+        self.assertIsNone(detail.get_project_detail('chess-engine'))
+        self.assertEqual(get_cache().get(f'website:project:{get_generation()}:chess-engine'), detail.MISSING)
+        with self.assertNumQueries(0):
+            self.assertIsNone(detail.get_project_detail('chess-engine'))
+        with self.captureOnCommitCallbacks(execute=True):
+            created = Project.objects.create(title='Chess Engine', description='Minimax', github_url='')
+        self.assertEqual(detail.get_project_detail('chess-engine')['project'], created)
+        with self.assertNumQueries(0):
+            self.assertEqual(detail.get_project_detail('chess-engine')['project'], created)
+
+    def test_hidden_project_is_missing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.visible = False
+            self.project.save()
+        self.assertIsNone(detail.get_project_detail('weather-app'))
+        self.assertEqual(self.client.get(reverse('website:project_detail', args=['weather-app'])).status_code, 404)
+
+
+class IndexUsageTests(TestCase):
+    """The list/filter query shapes must be answered from their indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(20):
+            Project.objects.create(
+                title=f'Project {i}',
+                description='Description',
+                category='web' if i % 2 else 'tools',
+                featured=i % 5 == 0,
+                visible=i % 7 != 0,
+                github_url='https://github.com/Dimeji-G/example',
+                technologies='Python, Django',
+                order=i % 3,
+            )
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # A 20 row table is always cheaper to seq scan; make the planner
+            # show which index it would pick once the table has grown
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f'{index_name} not used:\n{plan}')
+        if connection.vendor == 'sqlite':
+            # The index has to provide the ordering, not a temp B-tree sort
+            self.assertNotIn('USE TEMP B-TREE', plan, plan)
+
+    def test_visible_projects(self):
+        self.assertUsesIndex(
+            Project.objects.filter(visible=True),
+            'project_visible_order_idx',
+        )
+
+    def test_visible_projects_cursor_page(self):
+        self.assertUsesIndex(
+            Project.objects.filter(visible=True).order_by('order', '-featured', '-created_at', '-id')[:21],
+            'project_visible_order_idx',
+        )
+
+    def test_category_filter(self):
+        self.assertUsesIndex(
+            Project.objects.filter(visible=True, category='web'),
+            'project_visible_category_idx',
+        )
+
+    def test_featured_projects(self):
+        self.assertUsesIndex(
+            Project.objects.filter(featured=True, visible=True)[:3],
+            'project_featured_order_idx',
+        )
+
+    def test_contact_changelist(self):
+        self.assertUsesIndex(Contact.objects.all(), 'contact_created_at_idx')
+
+
+class RelatedProjectsTests(TestCase):
+    def graph(self):
+        return {
+            (edge.project_id, edge.related_id, round(edge.score, 9))
+            for edge in RelatedProject.objects.all()
+        }
+
+    def assertMatchesFullRebuild(self):
+        incremental = self.graph()
+        rebuild_all()
+        self.assertEqual(incremental, self.graph())
+
+    def save(self, project, **changes):
+        for field, value in changes.items():
+            setattr(project, field, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+
+    def test_incremental_updates_match_full_rebuild(self):
+        techs = ['Python', 'Django', 'React', 'SQLite', 'Azure', 'Flask']
+        projects = []
+        for i in range(14):
+            project = Project(
+                title=f'Project {i}', description='Description', github_url='',
+                category=['web', 'automation', 'education'][i % 3],
+                technologies=', '.join(techs[i % 4:i % 4 + 1 + i % 3]),
+            )
+            self.save(project)
+            projects.append(project)
+            self.assertMatchesFullRebuild()
+
+        self.save(projects[0], technologies='React, Azure, Flask')
+        self.assertMatchesFullRebuild()
+        self.save(projects[5], category='web')
+        self.assertMatchesFullRebuild()
+        self.save(projects[3], visible=False)
+        self.assertMatchesFullRebuild()
+        self.save(projects[3], visible=True)
+        self.assertMatchesFullRebuild()
+
+        listed = RelatedProject.objects.filter(related=projects[7]).values_list('project_id', flat=True)
+        self.assertTrue(listed)
+        with self.captureOnCommitCallbacks(execute=True):
+            projects[7].delete()
+        self.assertMatchesFullRebuild()
+        for other in Project.objects.filter(visible=True):
+            self.assertLessEqual(other.related_links.count(), RELATED_LIMIT)
+
+
+@override_settings(
+    STORAGES=PLAIN_STORAGES,
+    CACHES=LOCMEM_CACHES,
+    CONTACT_RATELIMIT_BACKEND='memory',
+    CONTACT_RATELIMIT_IP='1000/60',
+    CONTACT_RATELIMIT_EMAIL='1000/60',
+    CONTACT_MIN_FILL_SECONDS=0,
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    CONTACT_EMAIL='owner@example.com',
+    OUTBOX_MAX_ATTEMPTS=3,
+    OUTBOX_BACKOFF_SECONDS=10,
+)
+class OutboxTests(TestCase):
+    def submit(self, **overrides):
+        data = {
+            'name': 'Ada',
+            'email': 'ada@example.com',
+            'subject': 'project',
+            'message': 'Hello there',
+            'form_ts': form_timestamp(),
+        }
+        data.update(overrides)
+        return self.client.post(reverse('website:contact'), data)
+
+    def test_contact_post_queues_without_sending(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.contact, Contact.objects.get())
+        self.assertEqual(email.reply_to, 'ada@example.com')
+
+    def test_worker_delivers_pending_emails(self):
+        self.submit()
+        self.submit(email='grace@example.com')
+        self.assertEqual(deliver_pending(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertFalse(OutboxEmail.objects.filter(status='pending').exists())
+        self.assertEqual(deliver_pending(), (0, 0))
+
+    def test_failures_back_off_then_give_up(self):
+        self.submit()
+        email = OutboxEmail.objects.get()
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('relay down')):
+            self.assertEqual(deliver_pending(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=5))
+            self.assertEqual(deliver_pending(), (0, 0))
+
+            for _ in range(2):
+                OutboxEmail.objects.update(next_attempt_at=timezone.now())
+                deliver_pending()
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+        self.assertEqual(email.attempts, 3)
+        self.assertIn('relay down', email.last_error)
+
+    @override_settings(CONTACT_DIGEST_WINDOW=60, CONTACT_DIGEST_PER_SENDER=2)
+    def test_digest_merges_a_burst_into_one_email(self):
+        for i in range(4):
+            self.submit(message=f'Spam {i}', email='bot@example.com')
+        self.submit(email='grace@example.com', message='Real question')
+        self.assertEqual(deliver_pending(), (0, 0))  # window still open
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open') as opened:
+            self.assertEqual(deliver_pending(), (1, 0))
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        digest = mail.outbox[0]
+        self.assertIn('5 new messages from 2 sender(s)', digest.subject)
+        self.assertIn('Spam 1', digest.body)
+        self.assertNotIn('Spam 2', digest.body)
+        self.assertIn('2 more message(s) from bot@example.com', digest.body)
+        self.assertIn('Real question', digest.body)
+        self.assertEqual(OutboxEmail.objects.filter(status='digested').count(), 5)
+
+
+@override_settings(
+    STORAGES=PLAIN_STORAGES,
+    CACHES=LOCMEM_CACHES,
+    CONTACT_RATELIMIT_BACKEND='cache',
+    CONTACT_RATELIMIT_IP='2/60',
+    CONTACT_RATELIMIT_EMAIL='100/60',
+    CONTACT_MIN_FILL_SECONDS=0,
+)
+class ContactThrottleTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def post(self, **overrides):
+        data = {
+            'name': 'Ada',
+            'email': 'ada@example.com',
+            'subject': 'project',
+            'message': 'Hello there',
+            'form_ts': form_timestamp(),
+        }
+        data.update(overrides)
+        return self.client.post(reverse('website:contact'), data)
+
+    def test_honeypot_rejected_without_touching_the_database(self):
+        with self.assertNumQueries(0):
+            response = self.post(contact_hp_url='http://spam.example.com')
+        self.assertEqual(response.status_code, 400)
+
+    def test_honeypot_is_hidden_from_autofill(self):
+        response = self.client.get(reverse('website:contact'))
+        self.assertContains(
+            response,
+            '<input type="text" id="contact_hp_url" name="contact_hp_url" tabindex="-1" autocomplete="off">',
+            html=True,
+        )
+        # An autofilled "website" field is not mistaken for the honeypot
+        self.assertEqual(self.post(website='https://ada.example.com').status_code, 200)
+
+    def test_missing_or_forged_timestamp_rejected(self):
+        self.assertEqual(self.post(form_ts='').status_code, 400)
+        self.assertEqual(self.post(form_ts='1700000000:forged').status_code, 400)
+
+    @override_settings(CONTACT_MIN_FILL_SECONDS=30)
+    def test_form_filled_too_fast_rejected(self):
+        self.assertEqual(self.post().status_code, 400)
+
+    def test_ip_flood_gets_429_before_any_insert(self):
+        self.assertEqual(self.post().status_code, 200)
+        self.assertEqual(self.post().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.post()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(int(response['Retry-After']) >= 1)
+        self.assertEqual(Contact.objects.count(), 2)
+
+
+class SlidingWindowLimiterTests(TestCase):
+    def assertLimits(self, backend):
+        limiter = SlidingWindowLimiter('test', '3/60', backend)
+        self.assertEqual([bool(limiter.hit('a')) for _ in range(4)], [False, False, False, True])
+        self.assertFalse(limiter.hit('b'))
+
+    def test_memory_backend(self):
+        self.assertLimits(MemoryBackend())
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_cache_backend(self):
+        self.assertLimits(CacheBackend())
+
+    def test_database_backend(self):
+        self.assertLimits(DatabaseBackend())
+
+    def test_memory_log_slides(self):
+        backend = MemoryBackend()
+        self.assertEqual(backend.hit('k', 10, 100.0)[0], 1)
+        self.assertEqual(backend.hit('k', 10, 105.0)[0], 2)
+        self.assertEqual(backend.hit('k', 10, 111.0)[0], 2)
+
+    def test_counter_weights_previous_window(self):
+        backend = DatabaseBackend()
+        for _ in range(4):
+            backend.hit('k', 10, 105.0)
+        # 25% into the next window, 75% of the previous window still counts
+        self.assertEqual(backend.hit('k', 10, 112.5)[0], 4 * 0.75 + 1)
+
+
+def make_png(width=1200, height=800, color=(200, 40, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def run_jobs(self, executor=None):
+        with executor or ThreadPoolExecutor(max_workers=2) as pool:
+            return process_jobs(pool)
+
+    def create_project(self, data):
+        project = Project(
+            title='Pictured',
+            description='Description',
+            github_url='https://github.com/Dimeji-G/example',
+            technologies='Python',
+        )
+        project.image.save('shot.png', ContentFile(data), save=False)
+        project.save()
+        self.run_jobs()
+        project.refresh_from_db()
+        return project
+
+    def test_render_skips_upscaling(self):
+        rendered = render_derivatives(make_png(700, 350), formats=('webp',))
+        self.assertEqual([(w, h) for _, w, h, _ in rendered['variants']], [(320, 160), (640, 320), (700, 350)])
+
+    def test_upload_builds_variants_and_thumbnail(self):
+        project = self.create_project(make_png())
+        variants = project.image_variants
+        self.assertEqual(variants['source'], project.image.name)
+        self.assertEqual(set(variants['sources']), set(FORMATS))
+        self.assertEqual(
+            [source['width'] for source in variants['sources']['webp']],
+            [w for w in DERIVATIVE_WIDTHS if w < 1200] + [1200],
+        )
+        self.assertTrue(project.thumbnail)
+        with Image.open(project.thumbnail.path) as thumb:
+            self.assertEqual(thumb.size, (400, 267))
+        self.assertIn('640w', dict(project.image_sources())['image/webp'])
+
+    def test_unchanged_image_is_not_reprocessed(self):
+        project = self.create_project(make_png())
+        with mock.patch('website.images.render_derivatives') as render:
+            project.save()
+            self.assertEqual(self.run_jobs(), (0, 0))
+            # Same bytes under a new name: the same job is re-armed, and only
+            # the new name is recorded
+            project.image.save('again.png', ContentFile(make_png()), save=False)
+            project.save()
+            self.assertEqual(self.run_jobs(), (1, 0))
+        render.assert_not_called()
+        self.assertEqual(ImageJob.objects.count(), 1)
+        project.refresh_from_db()
+        self.assertEqual(project.image_variants['source'], project.image.name)
+
+    def replace_image(self, project, data):
+        project.image.save('replaced.png', ContentFile(data), save=False)
+        project.save()
+        self.run_jobs()
+        project.refresh_from_db()
+
+    def test_replaced_image_refreshes_generated_thumbnail(self):
+        project = self.create_project(make_png(color=(255, 0, 0)))
+        old_thumbnail = project.thumbnail.name
+        self.replace_image(project, make_png(color=(0, 0, 255)))
+        self.assertNotEqual(project.thumbnail.name, old_thumbnail)
+        self.assertEqual(
+            project.image_variants['thumbnail'],
+            {'name': project.thumbnail.name, 'hash': project.image_variants['hash']},
+        )
+        with Image.open(project.thumbnail.path) as thumb:
+            red, _, blue = thumb.convert('RGB').getpixel((10, 10))
+        self.assertGreater(blue, 200)
+        self.assertLess(red, 50)
+
+    def test_replaced_image_keeps_uploaded_thumbnail(self):
+        project = self.create_project(make_png(color=(255, 0, 0)))
+        project.thumbnail.save('mine.png', ContentFile(make_png(400, 267)), save=False)
+        project.save()
+        uploaded = project.thumbnail.name
+        self.replace_image(project, make_png(color=(0, 0, 255)))
+        self.assertEqual(project.thumbnail.name, uploaded)
+
+    def test_gallery_burst_is_queued_then_rendered_in_parallel(self):
+        project = self.create_project(make_png())
+        with mock.patch('website.images.render_derivatives') as render:
+            for i in range(6):
+                gallery_image = ProjectImage(project=project, order=i)
+                gallery_image.image.save(f'g{i}.png', ContentFile(make_png(color=(i, 0, 0))), save=False)
+                gallery_image.save()
+        render.assert_not_called()
+        self.assertEqual(ImageJob.objects.filter(status='pending').count(), 6)
+
+        executor = ProcessPoolExecutor(max_workers=2, mp_context=get_context('spawn'))
+        self.assertEqual(self.run_jobs(executor), (6, 0))
+        self.assertFalse(ImageJob.objects.exclude(status='done').exists())
+        self.assertEqual(set(ImageJob.objects.values_list('progress', flat=True)), {100})
+        for gallery_image in ProjectImage.objects.all():
+            self.assertEqual(gallery_image.image_variants['width'], 1200)
+
+
+class CountingStorage(Storage):
+    """Stand-in backend that counts how often it builds a URL"""
+    location = 'fake'
+
+    def __init__(self):
+        self.calls = 0
+
+    def url(self, name, expire=None):
+        self.calls += 1
+        return f'https://fake.example.com/{name}' + (f'?se={expire}' if expire else '')
+
+
+class CachedCountingStorage(CachedURLMixin, CountingStorage):
+    pass
+
+
+class CachedURLTests(TestCase):
+    def setUp(self):
+        clear_url_cache()
+        self.addCleanup(clear_url_cache)
+
+    def test_url_built_once_per_name(self):
+        storage = CachedCountingStorage()
+        for _ in range(3):
+            self.assertEqual(storage.url('projects/a.png'), 'https://fake.example.com/projects/a.png')
+        self.assertEqual(storage.calls, 1)
+
+    def test_bulk_resolution(self):
+        storage = CachedCountingStorage()
+        urls = bulk_urls(storage, ['a.png', 'b.png', 'a.png', None, ''])
+        self.assertEqual(list(urls), ['a.png', 'b.png'])
+        self.assertEqual(storage.calls, 2)
+        bulk_urls(storage, ['a.png', 'b.png'])
+        self.assertEqual(storage.calls, 2)
+
+    def test_signed_urls_are_not_cached(self):
+        storage = CachedCountingStorage()
+        storage.url('a.png', expire=60)
+        storage.url('a.png', expire=60)
+        self.assertEqual(storage.calls, 2)
+
+    def test_azure_urls_need_no_remote_calls(self):
+        # Azurite's well-known development account
+        storage = AzureMediaStorage(
+            account_name='devstoreaccount1',
+            account_key='Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==',
+            azure_container='media',
+        )
+        with mock.patch('azure.core.pipeline.Pipeline.run', side_effect=AssertionError('remote call')):
+            url = storage.url('projects/a b.png')
+            self.assertEqual(url, 'https://devstoreaccount1.blob.core.windows.net/media/projects/a%20b.png')
+            with mock.patch('storages.backends.azure_storage.BlobClient.from_blob_url') as build:
+                self.assertEqual(storage.url('projects/a b.png'), url)
+            build.assert_not_called()
+
+
+class EncodingMemoryStorage(InMemoryStorage):
+    """InMemoryStorage that records the Content-Encoding of each upload, like AzureStaticStorage"""
+    supports_content_encoding = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.encodings = {}
+
+    def _save(self, name, content):
+        self.encodings[name] = getattr(content, 'content_encoding', None)
+        return super()._save(name, content)
+
+
+@override_settings(
+    STORAGES={
+        **PLAIN_STORAGES,
+        'staticfiles': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    },
+    STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+)
+class SyncStaticTests(TestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        for name, content in (('css/site.css', 'body { color: red; }'), ('js/site.js', 'go();')):
+            self.write(name, content)
+        source = override_settings(STATICFILES_DIRS=[self.source])
+        source.enable()
+        self.addCleanup(source.disable)
+
+    def write(self, name, content):
+        path = f'{self.source}/{name}'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def sync(self):
+        out = io.StringIO()
+        call_command('syncstatic', stdout=out)
+        return out.getvalue()
+
+    def test_uploads_only_changes(self):
+        self.assertIn('Uploaded 2 changed file(s) of 2', self.sync())
+        manifest = json.loads(staticfiles_storage.open('staticfiles.json').read())
+        hashed = manifest['paths']['css/site.css']
+        self.assertRegex(hashed, r'^css/site\.[0-9a-f]{12}\.css$')
+        self.assertEqual(staticfiles_storage.open(hashed).read(), b'body { color: red; }')
+
+        with mock.patch('django.core.files.storage.InMemoryStorage._save') as save:
+            self.assertIn('up to date', self.sync())
+        save.assert_not_called()
+
+        self.write('css/site.css', 'body { color: blue; }')
+        self.assertIn('Uploaded 1 changed file(s) of 2', self.sync())
+        self.assertEqual(staticfiles_storage.open('css/site.css').read(), b'body { color: blue; }')
+        self.assertTrue(staticfiles_storage.exists(hashed))
+
+    def test_text_assets_are_gzipped_where_the_storage_sets_the_encoding(self):
+        self.write('css/site.css', 'body { color: red; }\n' * 50)
+        self.write('img/dot.png', 'not text')
+        with override_settings(STORAGES={
+            **PLAIN_STORAGES,
+            'staticfiles': {'BACKEND': 'website.tests.EncodingMemoryStorage'},
+        }):
+            self.sync()
+            encodings = staticfiles_storage.encodings
+            self.assertEqual(
+                gzip.decompress(staticfiles_storage.open('css/site.css').read()),
+                b'body { color: red; }\n' * 50,
+            )
+        self.assertEqual(encodings['css/site.css'], 'gzip')
+        # Too small to gain anything, not text, and read back by syncstatic itself
+        self.assertIsNone(encodings['js/site.js'])
+        self.assertIsNone(encodings['img/dot.png'])
+        self.assertIsNone(encodings['staticfiles.json'])
+
+    def test_azure_static_storage_sends_the_encoding(self):
+        # The manifest is read on construction; there is no container to read it from
+        with mock.patch.object(AzureStaticStorage, 'read_manifest', return_value=None):
+            storage = AzureStaticStorage(
+                account_name='devstoreaccount1',
+                account_key='Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==',
+                azure_container='static',
+            )
+        upload = ContentFile(b'...')
+        upload.content_encoding = 'gzip'
+        params = storage._get_content_settings_parameters('css/site.css', upload)
+        self.assertEqual((params['content_type'], params['content_encoding']), ('text/css', 'gzip'))
+        params = storage._get_content_settings_parameters('css/site.css', ContentFile(b'...'))
+        self.assertIsNone(params['content_encoding'])
+
+
+class AssetMinifyTests(TestCase):
+    def test_css(self):
+        source = """
+            /* header */
+            .nav a :hover , .x > .y {
+                color : red;
+                content: "keep  /* this */ ;";
+                margin: calc(100% - 2rem);
+            }
+            @media (min-width: 768px) { .a { display: none; } }
+        """
+        self.assertEqual(
+            minify_css(source),
+            '.nav a :hover,.x>.y{color : red;content:"keep  /* this */ ;";margin:calc(100% - 2rem)}'
+            '@media (min-width: 768px){.a{display:none}}',
+        )
+
+    def test_js_keeps_strings_templates_and_regexes(self):
+        source = """
+            // comment
+            const url = "http://example.com"; /* block */
+            const html = `<a href="${url}">${items.map(i => `<b>${i}</b>`).join('')}</a> // kept`;
+            if (/\\/[/]+/.test(url)) {
+                return total / 2;
+            }
+        """
+        self.assertEqual(minify_js(source), '\n'.join([
+            'const url = "http://example.com";',
+            'const html = `<a href="${url}">${items.map(i => `<b>${i}</b>`).join(\'\')}</a> // kept`;',
+            'if (/\\/[/]+/.test(url)) {',
+            'return total / 2;',
+            '}',
+        ]))
+
+    def test_js_division_after_increment_is_not_a_regex(self):
+        source = "total = count++ / 2; // it's half\nnext(--i / 2, /x/g);"
+        self.assertEqual(minify_js(source), 'total = count++ / 2;\nnext(--i / 2, /x/g);')
+
+    def test_buildassets_writes_only_minified_files(self):
+        with tempfile.TemporaryDirectory() as source, tempfile.TemporaryDirectory() as output:
+            os.makedirs(os.path.join(source, 'js'))
+            with open(os.path.join(source, 'js', 'main.js'), 'w') as f:
+                f.write('let a = 1;  // one\n')
+            call_command('buildassets', source=source, output=output, stdout=io.StringIO())
+            self.assertEqual(os.listdir(os.path.join(output, 'js')), ['main.js'])
+
+
+class CriticalCSSTests(TestCase):
+    html = (
+        '<html><body><nav class="navbar"><a class="nav-link">Home</a></nav>'
+        + '<p class="filler"></p>' * 10
+        + '<footer class="footer"></footer></body></html>'
+    )
+    css = """
+        :root { --accent: #fff; }
+        .navbar { position: fixed; animation: slide 1s; }
+        .nav-link:hover::after { width: 100%; }
+        .footer { margin-top: 4rem; }
+        @media (max-width: 768px) { .navbar { height: 3rem; } .footer { padding: 0; } }
+        @keyframes slide { from { opacity: 0; } }
+        @keyframes unused { from { opacity: 0; } }
+    """
+
+    def test_keeps_only_rules_for_the_top_of_the_page(self):
+        self.assertEqual(
+            extract_critical(self.html, self.css, limit=5),
+            ':root{--accent:#fff}.navbar{position:fixed;animation:slide 1s}.nav-link:hover::after{width:100%}'
+            '@media (max-width: 768px){.navbar{height:3rem}}@keyframes slide{from{opacity:0}}',
+        )
+
+    @override_settings(STORAGES=PLAIN_STORAGES)
+    def test_tag_inlines_only_current_entries(self):
+        name = 'css/contact.css'
+        entry = {'hash': stylesheet_hash(read_stylesheet(name)), 'css': '.contact-page{padding:0}'}
+        self.addCleanup(critical.clear_caches)
+
+        def render():
+            return Template("{% load critical %}{% stylesheet 'css/contact.css' %}").render(Context())
+
+        with mock.patch.object(critical, 'load_critical_file', return_value={None: {name: entry}}):
+            critical.clear_caches()
+            html = render()
+        self.assertIn('<style>.contact-page{padding:0}</style>', html)
+        self.assertIn('rel="preload" href="/static/css/contact.css" as="style"', html)
+        self.assertIn('<noscript><link rel="stylesheet" href="/static/css/contact.css"></noscript>', html)
+
+        with mock.patch.object(critical, 'load_critical_file', return_value={None: {name: {**entry, 'hash': 'stale'}}}):
+            critical.clear_caches()
+            self.assertEqual(render(), '<link rel="stylesheet" href="/static/css/contact.css">')
+
+    @override_settings(STORAGES=PLAIN_STORAGES)
+    def test_buildcritical_with_async_views(self):
+        Project.objects.create(title='Critical', description='Above the fold', github_url='', technologies='Python')
+        output = os.path.join(tempfile.mkdtemp(), 'critical.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(output))
+        self.addCleanup(critical.clear_caches)
+
+        def reload_urls():
+            # The project URLconf's include() resolver caches the old patterns
+            importlib.reload(urls)
+            importlib.reload(project_urls)
+            clear_url_caches()
+
+        with override_settings(ASYNC_VIEWS=True, CRITICAL_CSS_FILE=output):
+            self.addCleanup(reload_urls)
+            reload_urls()
+            self.assertIs(inspect.unwrap(resolve('/').func), inspect.unwrap(views.ahome))
+            call_command('buildcritical', stdout=io.StringIO())
+        with open(output) as f:
+            built = json.load(f)
+        self.assertIn('website/project_detail.html', built)
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Serves /repos/<owner>/<repo> from server.repos, honouring If-None-Match"""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        data = self.server.repos.get(self.path.removeprefix('/repos/'))
+        if data is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = f'"{hash(json.dumps(data, sort_keys=True)) & 0xffffffff:x}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GITHUB_TOKEN='')
+class GitHubStatsTests(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGitHubHandler)
+        self.server.repos = {
+            'dimeji/portfolio': {
+                'stargazers_count': 12, 'forks_count': 3, 'language': 'Python',
+                'pushed_at': '2024-05-01T10:00:00Z',
+            },
+        }
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        api = override_settings(GITHUB_API_URL=f'http://127.0.0.1:{self.server.server_port}')
+        api.enable()
+        self.addCleanup(api.disable)
+
+        for i, url in enumerate(['https://github.com/dimeji/portfolio.git', 'https://github.com/dimeji/gone', '']):
+            Project.objects.create(title=f'Project {i}', description='Description', category='web', github_url=url)
+
+    def test_parse_github_repo(self):
+        self.assertEqual(parse_github_repo('https://github.com/dimeji/portfolio/tree/main'), 'dimeji/portfolio')
+        self.assertIsNone(parse_github_repo('https://gitlab.com/dimeji/portfolio'))
+        self.assertIsNone(parse_github_repo(''))
+
+    def test_conditional_refresh(self):
+        self.assertEqual(refresh_stats(), (1, 0, 1))
+        stats = RepoStats.objects.get(full_name='dimeji/portfolio')
+        self.assertEqual((stats.stars, stats.forks, stats.language), (12, 3, 'Python'))
+        self.assertTrue(stats.etag)
+        self.assertIn('404', RepoStats.objects.get(full_name='dimeji/gone').last_error)
+
+        # Unchanged upstream: answered with 304 and the page cache is left alone
+        with mock.patch('website.github.bump_generation') as bump:
+            self.assertEqual(refresh_stats(), (0, 1, 1))
+        bump.assert_not_called()
+        self.assertEqual(
+            set(self.server.requests[-2:]),
+            {('/repos/dimeji/gone', None), ('/repos/dimeji/portfolio', stats.etag)},
+        )
+
+        self.server.repos['dimeji/portfolio']['stargazers_count'] = 13
+        self.assertEqual(refresh_stats(), (1, 0, 1))
+        self.assertEqual(RepoStats.objects.get(full_name='dimeji/portfolio').stars, 13)
+
+    def test_endpoint_reads_stored_stats(self):
+        call_command('refresh_github_stats', stdout=io.StringIO())
+        self.server.requests.clear()
+
+        response = self.client.get(reverse('website:github_stats'), {'repo': 'dimeji/portfolio'})
+        self.assertEqual(response.json(), {'repos': {'dimeji/portfolio': {
+            'stars': 12, 'forks': 3, 'language': 'Python', 'pushed_at': '2024-05-01T10:00:00+00:00',
+        }}})
+        self.assertEqual(self.client.get(reverse('website:github_stats'), {'repo': 'x/y'}).status_code, 404)
+        with override_settings(STORAGES=PLAIN_STORAGES):
+            detail = self.client.get(Project.objects.get(title='Project 0').get_absolute_url())
+        self.assertContains(detail, '<i class="fas fa-star"></i> 12')
+        self.assertEqual(self.server.requests, [])
+
+    def test_failed_first_fetch_is_not_shown(self):
+        refresh_stats()
+        gone = RepoStats.objects.get(full_name='dimeji/gone')
+        self.assertIsNotNone(gone.checked_at)
+        self.assertIsNone(gone.fetched_at)
+
+        response = self.client.get(reverse('website:github_stats'), {'repo': 'dimeji/gone'})
+        self.assertEqual(response.json(), {'repos': {}})
+        with override_settings(STORAGES=PLAIN_STORAGES):
+            detail = self.client.get(Project.objects.get(title='Project 1').get_absolute_url())
+        self.assertNotContains(detail, 'project-repo-stats')
+
+        # A later failure keeps the last good numbers on show
+        del self.server.repos['dimeji/portfolio']
+        get_cache().clear()
+        refresh_stats()
+        stats = RepoStats.objects.get(full_name='dimeji/portfolio')
+        self.assertTrue(stats.last_error)
+        self.assertEqual(self.client.get(reverse('website:github_stats')).json()['repos']['dimeji/portfolio']['stars'], 12)
+
+    @override_settings(STORAGES=PLAIN_STORAGES)
+    def test_pages_carry_the_endpoint_url(self):
+        get_cache().clear()
+        self.assertContains(
+            self.client.get(reverse('website:home')), f'data-github-stats-url="{reverse("website:github_stats")}"',
+        )
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class AsyncViewTests(TestCase):
+    """The async views must serve exactly what their sync versions do"""
+
+    def setUp(self):
+        for i in range(8):
+            Project.objects.create(
+                title=f'Project {i}', description='Description', category='web',
+                technologies='Django, Python', featured=i < 2,
+            )
+
+    async def assertSameResponse(self, sync_view, async_view, path, **kwargs):
+        await get_cache().aclear()
+        expected = await sync_to_async(sync_view)(RequestFactory().get(path), **kwargs)
+        await get_cache().aclear()
+        response = await async_view(AsyncRequestFactory().get(path), **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+
+    async def test_matches_sync_views(self):
+        slug = (await Project.objects.afirst()).slug
+        await self.assertSameResponse(views.home, views.ahome, '/')
+        await self.assertSameResponse(views.projects, views.aprojects, '/project/?category=web')
+        await self.assertSameResponse(views.project_detail, views.aproject_detail, '/project/x/', slug=slug)
+        await self.assertSameResponse(views.projects_api, views.aprojects_api, '/api/projects/?limit=3&fields=title,slug')
+        await self.assertSameResponse(views.projects_api, views.aprojects_api, '/api/projects/?fields=bogus')
+
+    async def test_missing_project(self):
+        with self.assertRaises(Http404):
+            await views.aproject_detail(AsyncRequestFactory().get('/project/missing/'), slug='missing')
+
+
+class EchoHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while data := self.request.recv(1024):
+            self.request.sendall(data)
+
+
+class LatencyProxyTests(TestCase):
+    def test_forwards_with_added_round_trip(self):
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), EchoHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        with LatencyProxy(server.server_address, latency=0.05) as proxy:
+            with socket.create_connection(('127.0.0.1', proxy.port), timeout=5) as sock:
+                started = time.monotonic()
+                sock.sendall(b'ping')
+                self.assertEqual(sock.recv(1024), b'ping')
+                self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    def test_closes_open_connections_quietly(self):
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), EchoHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        with self.assertNoLogs('asyncio'), LatencyProxy(server.server_address, latency=0.01) as proxy:
+            sock = socket.create_connection(('127.0.0.1', proxy.port), timeout=5)
+            self.addCleanup(sock.close)
+            sock.sendall(b'ping')
+            self.assertEqual(sock.recv(1024), b'ping')
+        # The proxy hung up on the connection that was still open
+        self.assertEqual(sock.recv(1024), b'')
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class LoadTestRoutesTests(LiveServerTestCase):
+    def test_routes_come_from_the_target(self):
+        get_cache().clear()
+        for i in range(2):
+            Project.objects.create(title=f'Remote {i}', description='Description')
+        host, port = self.live_server_url.removeprefix('http://').rsplit(':', 1)
+        routes = LoadTestCommand().target_routes(host, int(port))
+        self.assertIn(f"/project/catalog-{get_catalog()['digest']}.json", routes)
+        self.assertEqual(
+            sorted(route for route in routes if route.startswith('/project/remote-')),
+            ['/project/remote-0/', '/project/remote-1/'],
+        )
+
+    def test_unreachable_target_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, 'Could not read the routes'):
+            LoadTestCommand().target_routes('127.0.0.1', 1)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES, PERF_SAMPLE_RATE=1.0)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        view_stats.clear()
+        self.addCleanup(view_stats.clear)
+        for i in range(3):
+            Project.objects.create(title=f'Project {i}', description='Description', category='web')
+
+    def test_times_queries_and_templates(self):
+        with self.assertLogs('website.performance', 'INFO') as logs:
+            response = self.client.get(reverse('website:projects'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="[1-9]\d* queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['view'], line['status']), ('website:projects', 200))
+        self.assertGreater(line['template_ms'], 0)
+        self.assertEqual(view_stats.summary()['website:projects']['count'], 1)
+
+    async def test_counts_queries_under_asgi(self):
+        with self.assertLogs('website.performance', 'INFO') as logs:
+            await self.async_client.get(reverse('website:projects'))
+        self.assertGreater(json.loads(logs.records[0].getMessage())['queries'], 0)
+
+    @override_settings(PERF_SAMPLE_RATE=0.0)
+    def test_off_when_not_sampling(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('website:home')))
+        self.assertEqual(view_stats.summary(), {})
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse('website:performance_stats')
+        with self.assertLogs('website.performance', 'INFO'):
+            self.assertEqual(self.client.get(url).status_code, 302)
+            self.client.get(reverse('website:about'))
+            self.client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+            stats = self.client.get(url).json()['views']
+        self.assertEqual(set(stats['website:about']), {'count', 'p50_ms', 'p95_ms', 'p99_ms', 'db_ms', 'template_ms', 'queries'})
+
+    def test_template_backend_keeps_lookup_errors(self):
+        backend = engines.all()[0]
+        self.assertIsInstance(backend.get_template('website/about.html'), TimedTemplate)
+        with self.assertRaises(TemplateDoesNotExist) as raised:
+            backend.get_template('website/missing.html')
+        self.assertIs(raised.exception.backend, backend)
+        self.assertTrue(raised.exception.tried)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, CACHES=LOCMEM_CACHES)
+class QueryCountTests(TestCase):
+    """
+    Every public view and admin changelist must run the same number of
+    queries whatever the size of the catalog: no query per card or row.
+    """
+    # Every size has at least one project in each filter used below
+    sizes = (2, 6, 14)
+
+    def setUp(self):
+        self.created = 0
+
+    def grow(self, size):
+        """
+        Add projects up to ``size``, each with technologies, gallery images
+        (which queue ImageJobs) and the rows only the admin lists
+        """
+        for i in range(self.created, size):
+            project = Project.objects.create(
+                title=f'Project {i}',
+                description='Description',
+                category='web' if i % 2 else 'tools',
+                featured=i < 3,
+                technologies=f'Python, Django, Tool {i % 4}',
+                github_url=f'https://github.com/dimeji/project-{i}',
+                image=f'projects/{i}.png',
+            )
+            for order in range(2):
+                ProjectImage.objects.create(project=project, image=f'gallery/{i}-{order}.png', order=order)
+            contact = Contact.objects.create(name='Ada', email=f'ada{i}@example.com', subject='question', message='Hi')
+            OutboxEmail.objects.create(subject='Hi', body='Hi', from_email='a@example.com', to='b@example.com', contact=contact)
+            RepoStats.objects.create(full_name=project.github_repo, stars=i, fetched_at=timezone.now())
+        self.created = size
+
+    def reset_caches(self):
+        get_cache().clear()
+        detail._local.clear()
+        clear_url_cache()
+
+    def assertConstantQueries(self, *urls):
+        """Request each URL at every catalog size; the query count must not change"""
+        runs = {url: [] for url in urls}
+        for size in self.sizes:
+            self.grow(size)
+            for url in urls:
+                self.reset_caches()
+                target = url() if callable(url) else url
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(target)
+                self.assertEqual(response.status_code, 200, target)
+                runs[url].append((size, target, queries.captured_queries))
+
+        for url, url_runs in runs.items():
+            counts = {size: len(queries) for size, _, queries in url_runs}
+            if len(set(counts.values())) > 1:
+                size, target, queries = url_runs[-1]
+                sql = '\n'.join(f'{n}. {query["sql"]}' for n, query in enumerate(queries, 1))
+                self.fail(f'Query count grows with the catalog for {target}: {counts}\nWith {size} projects:\n{sql}')
+
+    def test_public_views(self):
+        self.assertConstantQueries(
+            reverse('website:home'),
+            reverse('website:about'),
+            reverse('website:projects'),
+            reverse('website:projects') + '?tech=Python&category=web',
+            reverse('website:projects_api'),
+            reverse('website:projects_api') + '?tech=Python&fields=title,tags,image,srcset',
+            reverse('website:github_stats'),
+            lambda: Project.objects.order_by('-id').first().get_absolute_url(),
+        )
+
+    def test_admin_changelists(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.assertConstantQueries(*(
+            reverse(f'admin:website_{model._meta.model_name}_changelist')
+            for model in (Project, ProjectImage, Technology, Contact, OutboxEmail, ImageJob, RepoStats)
+        ))
+
+
+class SyntheticDataTests(TestCase):
+    def test_rows_are_deterministic_and_valid(self):
+        rows = list(project_rows(20, seed=3))
+        self.assertEqual(rows, list(project_rows(20, seed=3)))
+        self.assertNotEqual(rows, list(project_rows(20, seed=4)))
+        self.assertEqual(list(project_rows(5, start=15, seed=3)), rows[15:])
+
+        seed_catalog(20, seed=3)
+        self.assertEqual(Project.objects.count(), 20)
+        for project in Project.objects.all():
+            project.full_clean(exclude=['github_url', 'live_url'])
+
+    def test_populate_projects_is_idempotent(self):
+        counts = []
+        for _ in range(2):
+            call_command(
+                'populate_projects', synthetic=12, contacts=7, batch_size=5, related=True, stdout=io.StringIO(),
+            )
+            counts.append((
+                Project.objects.count(), Contact.objects.count(), ProjectImage.objects.count(),
+                Technology.objects.count(),
+            ))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(counts[0][:2], (17, 7))
+
+        game = Project.objects.get(slug='nigeria-map-game')
+        self.assertIn('36 states', game.description)
+        self.assertEqual(game.short_description, game.description)
+        self.assertEqual(game.get_technologies_list(), ['Python', 'Tkinter', 'SQLite', 'Desktop'])
+        self.assertEqual(
+            list(game.tech_links.order_by('order').values_list('technology__name', flat=True)),
+            ['Python', 'Tkinter', 'SQLite', 'Desktop'],
+        )
+        self.assertEqual(Technology.objects.get(name='Python').icon, 'fab fa-python')
+        self.assertTrue(game.related_links.exists())
+
+    def test_populate_projects_keeps_admin_edits(self):
+        call_command('populate_projects', synthetic=3, contacts=0, stdout=io.StringIO())
+        game = Project.objects.get(slug='nigeria-map-game')
+        game.description = 'Edited in the admin'
+        game.technologies = 'Tkinter'
+        game.featured = False
+        game.save()
+        generated = Project.objects.exclude(pk=game.pk).order_by('-pk').first()
+        generated.description = 'Changed by hand'
+        generated.save()
+
+        output = io.StringIO()
+        call_command('populate_projects', synthetic=3, contacts=0, stdout=output)
+        self.assertIn('Project already exists: Nigeria Map Game', output.getvalue())
+        game.refresh_from_db()
+        self.assertEqual((game.description, game.featured), ('Edited in the admin', False))
+        self.assertEqual(list(game.tech_links.values_list('technology__name', flat=True)), ['Tkinter'])
+        # Generated rows are rewritten from the seed
+        generated.refresh_from_db()
+        self.assertNotEqual(generated.description, 'Changed by hand')
+
+
+class ContactExportTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        rows = [
+            ('Old', 40, False, False),
+            ('Replied', 5, True, False),
+            ('Subscriber', 3, False, True),
+            ('=HYPERLINK("x")', 1, False, False),
+        ]
+        for name, days, replied, newsletter in rows:
+            contact = Contact.objects.create(
+                name=name, email='a@example.com', subject='other', message='Hi, there\n"quoted"',
+                replied=replied, newsletter=newsletter,
+            )
+            Contact.objects.filter(pk=contact.pk).update(created_at=now - timedelta(days=days))
+
+    def export(self, *args):
+        out = io.StringIO()
+        call_command('export_contacts', *args, stdout=out)
+        return out.getvalue()
+
+    def test_csv_filters_and_escaping(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('--since', str(timezone.localdate() - timedelta(days=10))))))
+        self.assertEqual([row['name'] for row in rows], ['\'=HYPERLINK("x")', 'Subscriber', 'Replied'])
+        self.assertEqual(rows[0]['message'], 'Hi, there\n"quoted"')
+
+        rows = list(csv.DictReader(io.StringIO(self.export('--no-replied', '--no-newsletter'))))
+        self.assertEqual([row['name'] for row in rows], ['\'=HYPERLINK("x")', 'Old'])
+
+    def test_jsonl(self):
+        lines = self.export('--format', 'jsonl', '--newsletter').splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['name'], 'Subscriber')
+
+        until = (timezone.localdate() - timedelta(days=5)).isoformat()
+        names = [json.loads(line)['name'] for line in self.export('--format', 'jsonl', '--until', until).splitlines()]
+        self.assertEqual(names, ['Replied', 'Old'])
+
+    def test_admin_action_streams(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        response = self.client.post(reverse('admin:website_contact_changelist') + '?replied__exact=0', {
+            'action': 'export_jsonl',
+            '_selected_action': list(Contact.objects.values_list('pk', flat=True)),
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        names = [json.loads(line)['name'] for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(names, ['=HYPERLINK("x")', 'Subscriber', 'Old'])
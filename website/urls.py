@@ -5,11 +5,24 @@ from . import views
 
 app_name = 'website'
 
+# Under an ASGI server, the read-only pages use their async versions
+if settings.ASYNC_VIEWS:
+    home, projects = views.ahome, views.aprojects
+    project_detail, projects_api = views.aproject_detail, views.aprojects_api
+else:
+    home, projects = views.home, views.projects
+    project_detail, projects_api = views.project_detail, views.projects_api
+
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', home, name='home'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
-    path('project/', views.projects, name='projects'),
+    path('project/', projects, name='projects'),
+    path('project/<slug:slug>/', project_detail, name='project_detail'),
+    path('project/catalog-<str:digest>.json', views.projects_catalog, name='projects_catalog'),
+    path('api/projects/', projects_api, name='projects_api'),
+    path('api/github-stats/', views.github_stats, name='github_stats'),
+    path('api/performance/', views.performance_stats, name='performance_stats'),
 ]
 
 if settings.DEBUG:
@@ -1,12 +1,33 @@
-from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.contrib import messages
-from django.core.mail import send_mail
+from django.contrib.admin.views.decorators import staff_member_required
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from .cache import versioned_cache_page
+from .catalog import PROJECT_FIELDS, aget_catalog, get_catalog, serialize_project_rows
+from .detail import aget_project_detail, get_project_detail
+from .github import stats_for, tracked_repos
+from .middleware import view_stats
 from .models import Project, Technology, Contact
+from .outbox import enqueue_contact_notification
+from .ratelimit import check_contact_rate, form_timestamp, looks_like_bot
+from .search import search_projects
+import base64
+import binascii
 import json
+from datetime import datetime
 
 
+INITIAL_PROJECT_CARDS = 6
+CATALOG_MAX_AGE = 60 * 60 * 24 * 365
+
+
+@versioned_cache_page()
 def home(request):
     # Get featured projects for the homepage
     featured_projects = Project.objects.filter(featured=True, visible=True)[:3]
@@ -16,6 +37,7 @@ def home(request):
     return render(request, 'website/index.html', context)
 
 
+@versioned_cache_page()
 def about(request):
     # Get technologies for skills section
     technologies = Technology.objects.all()
@@ -25,40 +47,88 @@ def about(request):
     return render(request, 'website/about.html', context)
 
 
+@versioned_cache_page(vary_on=('category', 'tech', 'q'))
 def projects(request):
     # Get all visible projects
-    all_projects = Project.objects.filter(visible=True)
+    all_projects = filter_projects(request, Project.objects.filter(visible=True).with_technologies())
+    
+    # Search results are ranked and rendered in full; otherwise only the
+    # first screen is rendered here and the rest comes from the catalog blob
+    query = request.GET.get('q', '').strip()
+    if query:
+        all_projects = search_projects(all_projects, query)
+    else:
+        all_projects = all_projects[:INITIAL_PROJECT_CARDS]
     
-    # Filter by category if specified
+    catalog = get_catalog()
+    return render(request, 'website/projects.html', _projects_context(request, all_projects, catalog))
+
+
+def filter_projects(request, projects):
+    """Apply the ?category= and ?tech= filters shared by the projects page and API"""
     category = request.GET.get('category')
     if category and category != 'all':
         if category == 'featured':
-            all_projects = all_projects.filter(featured=True)
+            projects = projects.filter(featured=True)
         else:
-            all_projects = all_projects.filter(category=category)
+            projects = projects.filter(category=category)
     
-    context = {
-        'projects': all_projects,
+    # Filter by technology through the indexed link table
+    tech = request.GET.get('tech')
+    if tech:
+        projects = projects.using_technology(tech)
+    return projects
+
+
+def _projects_context(request, projects, catalog):
+    return {
+        'projects': projects,
+        'active_filter': request.GET.get('category') or 'all',
+        'active_tech': request.GET.get('tech') or '',
+        'search_query': request.GET.get('q', '').strip(),
+        'catalog_digest': catalog['digest'],
     }
-    return render(request, 'website/projects.html', context)
 
 
-def project_detail(request, slug):
-    project = get_object_or_404(Project, slug=slug, visible=True)
-    related_projects = Project.objects.filter(
-        category=project.category, 
-        visible=True
-    ).exclude(id=project.id)[:3]
+def projects_catalog(request, digest):
+    """Serve the precomputed project catalog, gzipped when the client allows it"""
+    catalog = get_catalog()
     
-    context = {
-        'project': project,
-        'related_projects': related_projects,
-    }
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(catalog['gzip'], content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(catalog['raw'], content_type='application/json')
+    patch_vary_headers(response, ['Accept-Encoding'])
+    
+    if digest == catalog['digest']:
+        # The URL is content-addressed, so it can be cached forever
+        patch_cache_control(response, public=True, max_age=CATALOG_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def project_detail(request, slug):
+    # Served from the per-process LRU / shared cache once warm (see detail.py)
+    context = get_project_detail(slug)
+    if context is None:
+        raise Http404('No project matches the given slug.')
     return render(request, 'website/project_detail.html', context)
 
 
 def contact(request):
     if request.method == 'POST':
+        # Cheap rejections first: no ORM work for bots or floods
+        if looks_like_bot(request):
+            return HttpResponseBadRequest('Invalid submission.', content_type='text/plain')
+        
+        retry_after = check_contact_rate(request, request.POST.get('email'))
+        if retry_after:
+            response = HttpResponse('Too many messages, please try again later.', status=429, content_type='text/plain')
+            response['Retry-After'] = str(int(retry_after))
+            return response
+        
         # Handle contact form submission
         name = request.POST.get('name')
         email = request.POST.get('email')
@@ -66,58 +136,218 @@ def contact(request):
         message = request.POST.get('message')
         newsletter = request.POST.get('newsletter') == 'on'
         
-        # Save to database
-        contact_submission = Contact.objects.create(
-            name=name,
-            email=email,
-            subject=subject,
-            message=message,
-            newsletter=newsletter
-        )
-        
-        # Send email notification (optional)
-        try:
-            send_mail(
-                subject=f'Portfolio Contact: {subject}',
-                message=f'From: {name} ({email})\n\nMessage:\n{message}',
-                from_email=settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@dimroid.com',
-                recipient_list=[settings.CONTACT_EMAIL if hasattr(settings, 'CONTACT_EMAIL') else 'dimeji@dimroid.com'],
-                fail_silently=True,
+        # Save the submission and queue its notification together; the email
+        # itself is sent by the process_outbox worker, not this request
+        with transaction.atomic():
+            contact_submission = Contact.objects.create(
+                name=name,
+                email=email,
+                subject=subject,
+                message=message,
+                newsletter=newsletter
             )
-        except Exception as e:
-            print(f"Failed to send email: {e}")
+            enqueue_contact_notification(contact_submission)
         
         messages.success(request, 'Thank you for your message! I\'ll get back to you soon.')
-        return render(request, 'website/contact.html')
     
-    return render(request, 'website/contact.html')
+    context = {
+        'form_timestamp': form_timestamp(),
+        'honeypot_field': settings.CONTACT_HONEYPOT_FIELD,
+    }
+    return render(request, 'website/contact.html', context)
 
 
-def projects_api(request):
-    """API endpoint to get projects data for JavaScript"""
-    projects = Project.objects.filter(visible=True)
+API_DEFAULT_LIMIT = 20
+API_MAX_LIMIT = 100
+
+# Meta.ordering plus the primary key as a unique tie-breaker
+API_CURSOR_FIELDS = ('order', 'featured', 'created_at', 'id')
+
+
+def _encode_cursor(row):
+    values = [row['order'], row['featured'], row['created_at'].isoformat(), row['id']]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded))
+    if not isinstance(values, list) or len(values) != 4:
+        raise ValueError('A cursor is a list of four values')
+    order, featured, created_at, pk = values
+    # bool is an int subclass, so compare the exact types
+    if type(order) is not int or type(pk) is not int or type(featured) is not bool or type(created_at) is not str:
+        raise ValueError('Cursor values have the wrong types')
+    created_at = datetime.fromisoformat(created_at)
+    return (
+        Q(order__gt=order)
+        | Q(order=order, featured__lt=featured)
+        | Q(order=order, featured=featured, created_at__lt=created_at)
+        | Q(order=order, featured=featured, created_at=created_at, id__lt=pk)
+    )
+
+
+def _parse_api_request(request):
+    """
+    Validate projects_api's parameters. Returns (queryset, options), or
+    (None, error response) for a bad request.
+    """
+    projects = filter_projects(request, Project.objects.filter(visible=True))
     
-    # Filter by category if specified
-    category = request.GET.get('category')
-    if category and category != 'all':
-        if category == 'featured':
-            projects = projects.filter(featured=True)
-        else:
-            projects = projects.filter(category=category)
+    fields = request.GET.get('fields')
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else list(PROJECT_FIELDS)
+    unknown = [f for f in fields if f not in PROJECT_FIELDS]
+    if unknown:
+        return None, JsonResponse({'error': f"Unknown fields: {', '.join(unknown)}"}, status=400)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', API_DEFAULT_LIMIT)), 1), API_MAX_LIMIT)
+    except ValueError:
+        return None, JsonResponse({'error': 'limit must be an integer'}, status=400)
     
-    projects_data = []
-    for project in projects:
-        project_dict = {
-            'title': project.title,
-            'description': project.description,
-            'tags': project.get_technologies_list(),
-            'github': project.github_url,
-            'live': project.live_url,
-            'category': project.category,
-            'featured': project.featured,
-            'image': project.image.url if project.image else None,
-            'slug': project.slug,
+    query = request.GET.get('q', '').strip()
+    cursor = request.GET.get('cursor')
+    if cursor and not query:
+        try:
+            projects = projects.filter(_decode_cursor(cursor))
+        except (ValueError, TypeError, ValidationError, binascii.Error):
+            return None, JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    if not query:
+        columns = {PROJECT_FIELDS[f] for f in fields} | set(API_CURSOR_FIELDS)
+        projects = projects.order_by('order', '-featured', '-created_at', '-id').values(*columns)[:limit + 1]
+    return projects, {'fields': fields, 'limit': limit, 'query': query}
+
+
+def _search_response(results, fields):
+    rows = [
+        {**{f: getattr(project, f) for f in PROJECT_FIELDS.values()}, 'id': project.id, 'image': project.image.name}
+        for project in results
+    ]
+    projects_data = serialize_project_rows(rows, fields)
+    for project_dict, project in zip(projects_data, results):
+        project_dict['highlight'] = {
+            'title': project.title_highlight,
+            'description': project.description_highlight,
         }
-        projects_data.append(project_dict)
+    return JsonResponse({'projects': projects_data, 'next': None})
+
+
+def _page_response(request, rows, fields, limit):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    projects_data = serialize_project_rows(rows, fields)
+    
+    next_url = None
+    if has_more:
+        params = request.GET.copy()
+        params['cursor'] = _encode_cursor(rows[-1])
+        next_url = f'{request.path}?{params.urlencode()}'
+    
+    return JsonResponse({'projects': projects_data, 'next': next_url})
+
+
+@versioned_cache_page(vary_on=('category', 'tech', 'q', 'cursor', 'fields', 'limit'))
+def projects_api(request):
+    """
+    API endpoint to get projects data for JavaScript.
+
+    Supports cursor pagination (``?cursor=``, ``?limit=``) over the
+    project ordering, sparse fieldsets (``?fields=title,slug``) and
+    filtering by technology (``?tech=Django``). ``?q=`` switches to
+    ranked full-text search, returning at most ``limit`` results with
+    highlighted title/description snippets and no cursor.
+    """
+    projects, options = _parse_api_request(request)
+    if projects is None:
+        return options
+    
+    if options['query']:
+        results = search_projects(projects, options['query'], limit=options['limit'])
+        return _search_response(results, options['fields'])
+    return _page_response(request, list(projects), options['fields'], options['limit'])
+
+
+@versioned_cache_page(vary_on=('repo',))
+def github_stats(request):
+    """
+    Stars, forks, language and last push for the repositories linked from
+    projects, as ``{"repos": {"owner/repo": {...}}}``. ``?repo=owner/repo``
+    narrows it to one. Read from RepoStats, so GitHub is never contacted
+    on a visitor's behalf.
+    """
+    repo = request.GET.get('repo', '').strip()
+    repos = tracked_repos()
+    if repo:
+        if repo not in repos:
+            return JsonResponse({'error': 'Unknown repository'}, status=404)
+        repos = [repo]
+    return JsonResponse({'repos': stats_for(repos)})
+
+
+@staff_member_required
+def performance_stats(request):
+    """
+    Rolling per-view timings from PerformanceMiddleware for this process:
+    p50/p95/p99 total time plus mean DB time, template time and queries.
+    """
+    response = JsonResponse({
+        'sample_rate': settings.PERF_SAMPLE_RATE,
+        'views': view_stats.summary(),
+    })
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+# Async twins of the read-only views, routed instead of the sync ones when
+# ASYNC_VIEWS is on (see urls.py). They do the same work through the async
+# ORM and cache APIs, so under an ASGI server a request waiting on the
+# database or a slow client holds a coroutine rather than a worker thread.
+# Querysets are fully loaded before rendering: templates can't touch the
+# ORM from the event loop.
+
+@versioned_cache_page()
+async def ahome(request):
+    featured_projects = Project.objects.filter(featured=True, visible=True).with_technologies()[:3]
+    context = {
+        'featured_projects': [project async for project in featured_projects.aiterator()],
+    }
+    return render(request, 'website/index.html', context)
+
+
+@versioned_cache_page(vary_on=('category', 'tech', 'q'))
+async def aprojects(request):
+    all_projects = filter_projects(request, Project.objects.filter(visible=True).with_technologies())
+    
+    query = request.GET.get('q', '').strip()
+    if query:
+        # Full-text search is vendor-specific raw SQL; it runs in a thread
+        all_projects = await sync_to_async(search_projects)(all_projects, query)
+    else:
+        all_projects = [project async for project in all_projects[:INITIAL_PROJECT_CARDS].aiterator()]
     
-    return JsonResponse({'projects': projects_data})
+    catalog = await aget_catalog()
+    return render(request, 'website/projects.html', _projects_context(request, all_projects, catalog))
+
+
+async def aproject_detail(request, slug):
+    context = await aget_project_detail(slug)
+    if context is None:
+        raise Http404('No project matches the given slug.')
+    return render(request, 'website/project_detail.html', context)
+
+
+@versioned_cache_page(vary_on=('category', 'tech', 'q', 'cursor', 'fields', 'limit'))
+async def aprojects_api(request):
+    """Async projects_api()"""
+    projects, options = _parse_api_request(request)
+    if projects is None:
+        return options
+    
+    if options['query']:
+        results = await sync_to_async(search_projects)(projects, options['query'], limit=options['limit'])
+        return _search_response(results, options['fields'])
+    rows = [row async for row in projects.aiterator()]
+    return _page_response(request, rows, options['fields'], options['limit'])
+